@@ -0,0 +1,385 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+from . import metrics
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+    'expires REAL, accessed REAL NOT NULL) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_accessed_idx ON cache (accessed)',
+)
+# Больше параметров в одном запросе старые сборки SQLite не принимают.
+MAX_VARIABLES = 900
+
+
+class SQLiteCache(BaseCache):
+    """
+    Кэш в файле SQLite в режиме WAL, общий для процессов одного хоста.
+
+    LOCATION — путь к файлу базы. Целые числа хранятся как INTEGER,
+    поэтому incr выполняется одним UPDATE и атомарен между процессами;
+    остальные значения хранятся в pickle.
+
+    Вытесняются записи, к которым дольше всех не обращались. Время
+    обращения обновляется не чаще раза в ACCESS_RESOLUTION секунд,
+    чтобы чтения почти не брали блокировку на запись. Размер кэша
+    проверяется раз в CULL_INTERVAL записей каждого соединения.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.location = location
+        options = params.get('OPTIONS', {})
+        self.busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self.access_resolution = options.get('ACCESS_RESOLUTION', 1)
+        self.cull_interval = options.get('CULL_INTERVAL', 100)
+        # Число вытесненных записей; on_evict получает их ключи.
+        self.evictions = 0
+        self.on_evict = None
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        # Соединение своё у каждого потока и у каждого процесса:
+        # соединение SQLite нельзя наследовать через fork.
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+            local.writes = 0
+        return local.connection
+
+    def _connect(self):
+        directory = os.path.dirname(self.location)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self.location, timeout=self.busy_timeout, isolation_level=None
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for sql in SCHEMA:
+            connection.execute(sql)
+        return connection
+
+    @staticmethod
+    def _dump(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _fetch(self, keys):
+        """Живые значения по ключам; время обращения обновляется."""
+        now = time.time()
+        found = {}
+        stale = []
+        keys = list(keys)
+        for start in range(0, len(keys), MAX_VARIABLES):
+            chunk = keys[start:start + MAX_VARIABLES]
+            rows = self.connection.execute(
+                'SELECT key, value, accessed FROM cache WHERE key IN '
+                f'({", ".join("?" * len(chunk))}) '
+                'AND (expires IS NULL OR expires > ?)',
+                (*chunk, now),
+            )
+            for key, value, accessed in rows:
+                found[key] = self._load(value)
+                if now - accessed >= self.access_resolution:
+                    stale.append((now, key))
+        if stale:
+            with self.connection:
+                self.connection.execute('BEGIN')
+                self.connection.executemany(
+                    'UPDATE cache SET accessed = ? WHERE key = ?', stale
+                )
+        return found
+
+    def _write(self, rows):
+        """Сохраняет пары (ключ, значение, срок); срок уже абсолютный."""
+        now = time.time()
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires, accessed) '
+                'VALUES (?, ?, ?, ?)',
+                [
+                    (key, self._dump(value), expires, now)
+                    for key, value, expires in rows
+                ],
+            )
+        self._local.writes += len(rows)
+        if self._local.writes >= self.cull_interval:
+            self._local.writes = 0
+            self._cull()
+
+    def _cull(self):
+        connection = self.connection
+        evicted = []
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+            )
+            count, = connection.execute(
+                'SELECT COUNT(*) FROM cache'
+            ).fetchone()
+            if count > self._max_entries:
+                excess = count - self._max_entries
+                if self._cull_frequency:
+                    excess += count // self._cull_frequency
+                evicted = [key for key, in connection.execute(
+                    'SELECT key FROM cache ORDER BY accessed LIMIT ?',
+                    (excess,),
+                )]
+                connection.executemany(
+                    'DELETE FROM cache WHERE key = ?',
+                    [(key,) for key in evicted],
+                )
+        self.evictions += len(evicted)
+        if evicted and self.on_evict is not None:
+            self.on_evict(evicted)
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        return {
+            keys[key]: value for key, value in self._fetch(keys).items()
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write([(
+            self._key(key, version), value, self.get_backend_timeout(timeout)
+        )])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        self._write([
+            (self._key(key, version), value, expires)
+            for key, value in data.items()
+        ])
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        now = time.time()
+        # Просроченная запись заменяется, живая остаётся как была.
+        cursor = self.connection.execute(
+            'INSERT INTO cache (key, value, expires, accessed) '
+            'VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+            'value = excluded.value, expires = excluded.expires, '
+            'accessed = excluded.accessed '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            (
+                self._key(key, version), self._dump(value),
+                self.get_backend_timeout(timeout), now, now,
+            ),
+        )
+        return cursor.rowcount > 0
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        connection = self.connection
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            cursor = connection.execute(
+                'UPDATE cache SET value = value + ? WHERE key = ? '
+                "AND typeof(value) = 'integer' "
+                'AND (expires IS NULL OR expires > ?)',
+                (delta, key, time.time()),
+            )
+            if not cursor.rowcount:
+                raise ValueError(f"Key '{key}' not found")
+            value, = connection.execute(
+                'SELECT value FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self.connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (
+                self.get_backend_timeout(timeout),
+                self._key(key, version),
+                time.time(),
+            ),
+        )
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return key in self._fetch([key])
+
+    def delete(self, key, version=None):
+        self.connection.execute(
+            'DELETE FROM cache WHERE key = ?', (self._key(key, version),)
+        )
+
+    def delete_many(self, keys, version=None):
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.connection.executemany(
+                'DELETE FROM cache WHERE key = ?',
+                [(self._key(key, version),) for key in keys],
+            )
+
+    def clear(self):
+        self.connection.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединение остаётся открытым между запросами, как у LocMemCache.
+        pass
+
+
+class InstrumentedCache(BaseCache):
+    """
+    Обёртка над кэшем LOCATION, которая считает метрики по префиксам ключей.
+
+    Попадания, промахи, записи, вытеснения и время операций копятся
+    в процессе и периодически переносятся в сам кэш (см. core.metrics).
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.location = location
+
+    @cached_property
+    def backend(self):
+        backend = caches[self.location]
+        if hasattr(backend, 'on_evict'):
+            backend.on_evict = self._evicted
+        return backend
+
+    def _evicted(self, keys):
+        for key in keys:
+            # Ключи приходят в виде, собранном make_key: «префикс:версия:».
+            metrics.record(metrics.prefix(key.split(':', 2)[-1]), evictions=1)
+
+    def _timed(self, keys, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latency = int((time.perf_counter() - started) * 1e6)
+            keys = list(keys)
+            for key in keys:
+                metrics.record(
+                    metrics.prefix(key),
+                    latency_us=latency // len(keys),
+                    operations=1,
+                )
+            metrics.maybe_flush(self.backend)
+
+    def _reads(self, keys, found):
+        for key in keys:
+            if key in found:
+                metrics.record(metrics.prefix(key), hits=1)
+            else:
+                metrics.record(metrics.prefix(key), misses=1)
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = self._timed(
+            [key], self.backend.get, key, missing, version=version
+        )
+        if value is missing:
+            self._reads([key], ())
+            return default
+        self._reads([key], (key,))
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        found = self._timed(
+            keys, self.backend.get_many, keys, version=version
+        )
+        self._reads(keys, found)
+        return found
+
+    def has_key(self, key, version=None):
+        return self._timed(
+            [key], self.backend.has_key, key, version=version
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._timed(
+            [key], self.backend.set, key, value, timeout, version=version
+        )
+        metrics.record(metrics.prefix(key), sets=1)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        failed = self._timed(
+            data, self.backend.set_many, data, timeout, version=version
+        )
+        for key in data:
+            metrics.record(metrics.prefix(key), sets=1)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._timed(
+            [key], self.backend.add, key, value, timeout, version=version
+        )
+        if added:
+            metrics.record(metrics.prefix(key), sets=1)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        try:
+            value = self._timed(
+                [key], self.backend.incr, key, delta, version=version
+            )
+        except ValueError:
+            self._reads([key], ())
+            raise
+        self._reads([key], (key,))
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._timed(
+            [key], self.backend.touch, key, timeout, version=version
+        )
+
+    def delete(self, key, version=None):
+        return self._timed(
+            [key], self.backend.delete, key, version=version
+        )
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        if keys:
+            self._timed(
+                keys, self.backend.delete_many, keys, version=version
+            )
+
+    def clear(self):
+        # Метрики хранятся в том же кэше и очищаются вместе с ним.
+        metrics.reset()
+        self.backend.clear()
+
+    def close(self, **kwargs):
+        self.backend.close(**kwargs)
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'filebased': 'django.core.cache.backends.filebased.FileBasedCache',
+    'sqlite': 'core.cache.SQLiteCache',
+}
+VALUE = 'x' * 2048
+
+
+def make_cache(backend, directory):
+    location = {
+        'locmem': 'bench',
+        'filebased': os.path.join(directory, 'filebased'),
+        'sqlite': os.path.join(directory, 'cache.sqlite3'),
+    }[backend]
+    return import_string(BACKENDS[backend])(location, {
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    })
+
+
+def work(backend, directory, options, seed, barrier, results):
+    """
+    Читает фрагменты по ключам и дорисовывает недостающие.
+
+    Часть операций — incr общего номера поколения: так видно, доходит ли
+    сброс кэша, сделанный одним процессом, до остальных.
+    """
+    cache = make_cache(backend, directory)
+    rng = random.Random(seed)
+    hits = misses = 0
+    barrier.wait()
+    started = time.perf_counter()
+    for _ in range(options['ops']):
+        if rng.random() < options['writes']:
+            try:
+                cache.incr('generation')
+            except ValueError:
+                cache.add('generation', 1)
+            continue
+        key = f'fragment:{rng.randint(1, options["keys"])}'
+        if cache.get(key) is None:
+            misses += 1
+            cache.set(key, VALUE)
+        else:
+            hits += 1
+    elapsed = time.perf_counter() - started
+    results.put((hits, misses, elapsed, cache.get('generation') or 0))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает кэши LocMemCache, FileBasedCache и SQLiteCache '
+        'под нагрузкой из нескольких процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--ops', type=int, default=20000,
+                            help='Операций на процесс.')
+        parser.add_argument('--keys', type=int, default=1000)
+        parser.add_argument('--writes', type=float, default=0.01,
+                            help='Доля операций incr.')
+        parser.add_argument('--backends', nargs='+', default=list(BACKENDS),
+                            choices=list(BACKENDS))
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"кэш":<10} {"оп/с":>10} {"попаданий":>10} '
+            f'{"промахов":>9} {"поколение":>10}'
+        )
+        for backend in options['backends']:
+            with tempfile.TemporaryDirectory() as directory:
+                self.run(backend, directory, options)
+
+    def run(self, backend, directory, options):
+        processes = options['processes']
+        barrier = multiprocessing.Barrier(processes)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=work, args=(
+                backend, directory, options, seed, barrier, results
+            ))
+            for seed in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        reports = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        hits = sum(report[0] for report in reports)
+        misses = sum(report[1] for report in reports)
+        elapsed = max(report[2] for report in reports)
+        # Для общего кэша номер поколения — сумма incr всех процессов,
+        # для LocMemCache каждый процесс видит только свои.
+        generation = min(report[3] for report in reports)
+        self.stdout.write(
+            f'{backend:<10} {(hits + misses) / elapsed:>10.0f} '
+            f'{hits / (hits + misses):>10.1%} {misses:>9} {generation:>10}'
+        )
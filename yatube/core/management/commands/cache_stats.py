@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = 'Печатает попадания, промахи и задержки кэша по префиксам ключей.'
+
+    def handle(self, *args, **options):
+        stats = metrics.collect(cache.backend)
+        self.stdout.write(
+            f'{"префикс":<20} {"попадания":>10} {"промахи":>10} '
+            f'{"доля":>7} {"записи":>8} {"вытеснено":>10} {"мс/оп":>7}'
+        )
+        for key_prefix, values in sorted(
+            stats.items(), key=lambda item: -item[1]['operations']
+        ):
+            reads = values['hits'] + values['misses']
+            ratio = values['hits'] / reads if reads else 0
+            latency = (
+                values['latency_us'] / values['operations'] / 1000
+                if values['operations'] else 0
+            )
+            self.stdout.write(
+                f'{key_prefix:<20} {values["hits"]:>10} '
+                f'{values["misses"]:>10} {ratio:>7.1%} {values["sets"]:>8} '
+                f'{values["evictions"]:>10} {latency:>7.3f}'
+            )
@@ -0,0 +1,119 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+KEY = 'cache_metrics:{}:{}'
+PREFIXES_KEY = 'cache_metrics:prefixes'
+# Счётчики хранятся в кэше целыми числами, задержка — в микросекундах.
+STATS = (
+    'hits', 'misses', 'sets', 'evictions', 'latency_us', 'operations',
+)
+METRICS = (
+    ('hits', 'yatube_cache_hits_total', 'counter',
+     'Чтения, нашедшие значение.'),
+    ('misses', 'yatube_cache_misses_total', 'counter',
+     'Чтения, не нашедшие значения.'),
+    ('sets', 'yatube_cache_sets_total', 'counter',
+     'Записанные значения.'),
+    ('evictions', 'yatube_cache_evictions_total', 'counter',
+     'Значения, вытесненные при переполнении кэша.'),
+)
+
+_lock = threading.Lock()
+_pending = defaultdict(Counter)
+_prefixes = set()
+_flushed = time.monotonic()
+
+
+def prefix(key):
+    """Начало ключа до первого двоеточия, точки или черты."""
+    return re.split(r'[:.|]', str(key), 1)[0]
+
+
+def record(key_prefix, **stats):
+    with _lock:
+        _pending[key_prefix].update(stats)
+        _prefixes.add(key_prefix)
+
+
+def reset():
+    """Забывает не перенесённые в кэш счётчики процесса."""
+    with _lock:
+        _pending.clear()
+        _prefixes.clear()
+
+
+def maybe_flush(cache):
+    if time.monotonic() - _flushed >= settings.CACHE_METRICS_FLUSH_INTERVAL:
+        flush(cache)
+
+
+def flush(cache):
+    """
+    Переносит накопленные процессом счётчики в общий кэш.
+
+    Так их видят /metrics и cache_stats в любом процессе. cache — это
+    кэш без обёртки, чтобы запись метрик не попадала в метрики.
+    """
+    global _flushed
+    with _lock:
+        pending = {
+            key_prefix: stats for key_prefix, stats in _pending.items()
+            if stats
+        }
+        _pending.clear()
+        prefixes = set(_prefixes)
+        _flushed = time.monotonic()
+    for key_prefix, stats in pending.items():
+        for stat, value in stats.items():
+            key = KEY.format(key_prefix, stat)
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                if not cache.add(key, value, None):
+                    cache.incr(key, value)
+    known = set(cache.get(PREFIXES_KEY, ()))
+    if not prefixes <= known:
+        cache.set(PREFIXES_KEY, sorted(known | prefixes), None)
+
+
+def collect(cache):
+    """Счётчики всех процессов по префиксам ключей."""
+    flush(cache)
+    prefixes = cache.get(PREFIXES_KEY, ())
+    keys = {
+        KEY.format(key_prefix, stat): (key_prefix, stat)
+        for key_prefix in prefixes
+        for stat in STATS
+    }
+    stats = {key_prefix: dict.fromkeys(STATS, 0) for key_prefix in prefixes}
+    for key, value in cache.get_many(keys).items():
+        key_prefix, stat = keys[key]
+        stats[key_prefix][stat] = value
+    return stats
+
+
+def to_prometheus(stats):
+    """Текстовый формат Prometheus."""
+    lines = []
+    for stat, name, kind, help_text in METRICS:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [
+            f'{name}{{prefix="{key_prefix}"}} {values[stat]}'
+            for key_prefix, values in sorted(stats.items())
+        ]
+    name = 'yatube_cache_latency_seconds'
+    lines += [
+        f'# HELP {name} Время операций с кэшем.',
+        f'# TYPE {name} summary',
+    ]
+    for key_prefix, values in sorted(stats.items()):
+        lines += [
+            f'{name}_sum{{prefix="{key_prefix}"}} '
+            f'{values["latency_us"] / 1e6:.6f}',
+            f'{name}_count{{prefix="{key_prefix}"}} {values["operations"]}',
+        ]
+    return '\n'.join(lines) + '\n'
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 
 
 class CreatedModel(models.Model):
@@ -10,3 +11,39 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class BlobQuerySet(models.QuerySet):
+    def retain(self, name):
+        """Добавляет ссылку на файл name."""
+        if self.filter(name=name).update(references=F('references') + 1):
+            return
+        _, created = self.get_or_create(name=name)
+        if not created:
+            self.filter(name=name).update(references=F('references') + 1)
+
+    def release(self, name):
+        """
+        Убирает ссылку на файл name.
+
+        Возвращает True, если ссылок не осталось и файл можно удалять.
+        """
+        self.filter(name=name, references__gt=0).update(
+            references=F('references') - 1
+        )
+        return self.filter(name=name, references=0).exists()
+
+
+class Blob(models.Model):
+    """Файл в хранилище по содержимому и число ссылок на него."""
+    name = models.CharField('Имя файла', max_length=255, primary_key=True)
+    references = models.PositiveIntegerField('Ссылок', default=1)
+
+    objects = BlobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
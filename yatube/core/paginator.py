@@ -0,0 +1,178 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = 'next'
+PREVIOUS = 'prev'
+
+
+class CountedPaginator(Paginator):
+    """Paginator, берущий число объектов у счётчика вместо COUNT(*)."""
+
+    def __init__(self, object_list, per_page, counter=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        if self.counter is None:
+            return super().count
+        return self.counter()
+
+
+class CursorPaginator:
+    """
+    Постраничная навигация по курсору (keyset).
+
+    Страница выбирается условием по полям сортировки, а не OFFSET,
+    и не требует COUNT(*), поэтому стоимость запроса не зависит
+    от глубины листания.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+
+    def encode_cursor(self, item, direction):
+        values = [
+            self._field_value(item, field) for field in self.fields
+        ]
+        raw = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Возвращает (направление, значения) или None для плохого курсора."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+        except (binascii.Error, ValueError, TypeError):
+            return None
+        if direction not in (NEXT, PREVIOUS) or (
+            not isinstance(values, list) or len(values) != len(self.fields)
+        ):
+            return None
+        model_meta = self.object_list.model._meta
+        try:
+            values = [
+                model_meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except ValidationError:
+            return None
+        return direction, values
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу; некорректный курсор ведёт на первую."""
+        decoded = self.decode_cursor(cursor)
+        if decoded is None:
+            items = list(
+                self.object_list.order_by(*self.ordering)[:self.per_page + 1]
+            )
+            return CursorPage(
+                items[:self.per_page], self,
+                has_next=len(items) > self.per_page,
+                has_previous=False,
+            )
+        direction, values = decoded
+        backwards = direction == PREVIOUS
+        ordering = (
+            self._reverse_ordering() if backwards else self.ordering
+        )
+        items = list(
+            self.object_list.filter(
+                self._keyset_filter(values, backwards)
+            ).order_by(*ordering)[:self.per_page + 1]
+        )
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            items.reverse()
+            return CursorPage(
+                items, self, has_next=True, has_previous=has_more
+            )
+        return CursorPage(items, self, has_next=has_more, has_previous=True)
+
+    def _keyset_filter(self, values, backwards):
+        """
+        Условие «строго после курсора» в порядке сортировки.
+
+        Избыточная нестрогая граница по первому полю превращает
+        условие в диапазон индекса: без неё SQLite не видит границу
+        внутри OR и просматривает индекс целиком.
+        """
+        condition = Q()
+        equal = Q()
+        bound = None
+        for order, field, value in zip(self.ordering, self.fields, values):
+            descending = order.startswith('-') != backwards
+            lookup = 'lt' if descending else 'gt'
+            if bound is None:
+                bound = Q(**{f'{field}__{lookup}e': value})
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return bound & condition
+
+    def _reverse_ordering(self):
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    @staticmethod
+    def _field_value(item, field):
+        if isinstance(item, dict):
+            return item[field]
+        return getattr(item, field)
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        first = self.object_list[0] if self.object_list else None
+        position = (
+            self.paginator.encode_cursor(first, NEXT) if first else 'empty'
+        )
+        return f'<CursorPage {position}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return ''
+        return self.paginator.encode_cursor(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return ''
+        return self.paginator.encode_cursor(self.object_list[0], PREVIOUS)
@@ -0,0 +1,80 @@
+import time
+
+from django.core.cache import cache
+
+LOCK_KEY = '{}:lock'
+# Дольше этого пересчёт не держит блокировку, даже если процесс упал.
+LOCK_TIMEOUT = 30
+# Сколько ждать чужого пересчёта, когда старого значения нет вовсе.
+WAIT_TIMEOUT = 5
+POLL_INTERVAL = 0.05
+# Сколько хранится значение после истечения срока, чтобы отдавать его
+# остальным запросам, пока один пересчитывает.
+STALE_TIMEOUT = 60 * 10
+STALE_ATTR = 'served_stale_cache'
+
+
+def _fresh(entry, version, now):
+    return (
+        entry is not None
+        and entry[0] == version
+        and (entry[1] is None or now < entry[1])
+    )
+
+
+def _recompute(key, lock, compute, timeout, version):
+    try:
+        value = compute()
+        if timeout is None:
+            cache.set(key, (version, None, value), None)
+        else:
+            cache.set(
+                key,
+                (version, time.time() + timeout, value),
+                timeout + STALE_TIMEOUT,
+            )
+        return value
+    finally:
+        cache.delete(lock)
+
+
+def get_or_compute(key, compute, timeout, version=None):
+    """
+    Значение из кэша; пересчитывает его только один запрос.
+
+    Значение устаревает по истечении timeout или при смене version.
+    Пока один запрос пересчитывает его под блокировкой cache.add,
+    остальные получают старое значение; если старого нет, они ждут
+    результат до WAIT_TIMEOUT секунд. Возвращает пару
+    (значение, отдано ли устаревшее значение).
+    """
+    lock = LOCK_KEY.format(key)
+    entry = cache.get(key)
+    if _fresh(entry, version, time.time()):
+        return entry[2], False
+    if entry is not None:
+        if cache.add(lock, 1, LOCK_TIMEOUT):
+            return _recompute(key, lock, compute, timeout, version), False
+        return entry[2], True
+    deadline = time.time() + WAIT_TIMEOUT
+    while not cache.add(lock, 1, LOCK_TIMEOUT):
+        if time.time() >= deadline:
+            return compute(), False
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if _fresh(entry, version, time.time()):
+            return entry[2], False
+    entry = cache.get(key)
+    if _fresh(entry, version, time.time()):
+        cache.delete(lock)
+        return entry[2], False
+    return _recompute(key, lock, compute, timeout, version), False
+
+
+def mark_stale(request):
+    """Отмечает, что в ответ на запрос попало устаревшее значение."""
+    setattr(request, STALE_ATTR, True)
+
+
+def served_stale(request):
+    return getattr(request, STALE_ATTR, False)
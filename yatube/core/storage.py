@@ -0,0 +1,74 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+from .models import Blob
+
+# «каталог/ab/cd/<sha256>.ext»: два уровня подкаталогов по началу хэша,
+# чтобы в одном каталоге не копились сотни тысяч файлов.
+HASHED_NAME = re.compile(
+    r'(?:.*/)?([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}'
+)
+
+
+def content_hash(content):
+    """SHA-256 содержимого файла, прочитанного по частям."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@deconstructible
+class HashedStorage(FileSystemStorage):
+    """
+    Хранилище по содержимому: файл лежит под именем из своего SHA-256.
+
+    Одинаковые загрузки хранятся одним файлом. Число ссылок на файл
+    ведётся в core.models.Blob: retain() и release() вызывает владелец
+    поля, последний release() удаляет файл после коммита транзакции.
+    Имена не из этого хранилища (старые загрузки) не учитываются.
+    """
+
+    def hashed_name(self, name, content):
+        digest = content_hash(content)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), digest[:2], digest[2:4],
+            digest + extension,
+        )
+
+    @staticmethod
+    def is_hashed(name):
+        return bool(name) and HASHED_NAME.fullmatch(
+            posixpath.splitext(name)[0]
+        ) is not None
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        saved = super()._save(name, content)
+        if saved != name:
+            # Тот же файл одновременно сохранил другой запрос.
+            self.delete(saved)
+        return name
+
+    def retain(self, name):
+        if self.is_hashed(name):
+            Blob.objects.retain(name)
+
+    def release(self, name):
+        if self.is_hashed(name) and Blob.objects.release(name):
+            transaction.on_commit(lambda: self.collect(name))
+
+    def collect(self, name):
+        """Удаляет файл, если на него так и не появилось новых ссылок."""
+        deleted, _ = Blob.objects.filter(name=name, references=0).delete()
+        if deleted:
+            self.delete(name)
@@ -0,0 +1,63 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from .. import stampede
+
+register = template.Library()
+
+KEY = 'fragment:{}'
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, name, vary_on, version):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.name = name
+        self.vary_on = vary_on
+        self.version = version
+
+    def render(self, context):
+        key = KEY.format(make_template_fragment_key(
+            self.name, [var.resolve(context) for var in self.vary_on]
+        ))
+        version = self.version.resolve(context) if self.version else None
+        value, stale = stampede.get_or_compute(
+            key,
+            lambda: self.nodelist.render(context),
+            self.timeout.resolve(context),
+            version,
+        )
+        request = context.get('request')
+        if stale and request is not None:
+            stampede.mark_stale(request)
+        return value
+
+
+@register.tag
+def fragment_cache(parser, token):
+    """
+    Кэширует фрагмент шаблона, как {% cache %}, но пересчитывает его
+    только один запрос, а остальные получают прежний вариант.
+
+        {% fragment_cache timeout name [var ...] [version=expr] %}
+
+    Смена version делает фрагмент устаревшим, не меняя ключа: пока
+    новый вариант рисуется, остальным отдаётся старый.
+    """
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 2 arguments."
+        )
+    version = None
+    if bits[-1].startswith('version='):
+        version = parser.compile_filter(bits.pop()[len('version='):])
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:]],
+        version,
+    )
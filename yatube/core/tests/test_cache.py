@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from ..cache import SQLiteCache
+
+PROCESSES = 4
+INCREMENTS = 200
+MAX_ENTRIES = 10
+
+
+def increment(location, times):
+    cache = SQLiteCache(location, {})
+    for _ in range(times):
+        cache.incr('counter')
+
+
+class TestSQLiteCache(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.location, {'OPTIONS': options})
+
+    def test_values_are_shared_between_instances(self):
+        """Запись одного экземпляра видна другому с тем же файлом."""
+        self.cache.set_many({'text': 'Текст', 'number': 1, 'list': [1]})
+        self.assertEqual(
+            self.make_cache().get_many(['text', 'number', 'list', 'none']),
+            {'text': 'Текст', 'number': 1, 'list': [1]},
+        )
+        self.make_cache().delete('text')
+        self.assertIsNone(self.cache.get('text'))
+
+    def test_timeouts(self):
+        """Просроченные записи не читаются и заменяются через add."""
+        self.cache.set('key', 'old', timeout=0.05)
+        self.assertFalse(self.cache.add('key', 'new'))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'new', timeout=None))
+        self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_incr(self):
+        """incr меняет число и не работает без значения."""
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        self.assertEqual(self.cache.decr('counter'), 5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.set('text', 'Текст')
+        with self.assertRaises(ValueError):
+            self.cache.incr('text')
+
+    def test_incr_is_atomic_between_processes(self):
+        """Одновременные incr из разных процессов не теряются."""
+        self.cache.set('counter', 0)
+        processes = [
+            multiprocessing.Process(
+                target=increment, args=(self.location, INCREMENTS)
+            )
+            for _ in range(PROCESSES)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(self.cache.get('counter'), PROCESSES * INCREMENTS)
+
+    def test_least_recently_used_are_evicted(self):
+        """При переполнении вытесняются давно не читанные записи."""
+        cache = self.make_cache(
+            MAX_ENTRIES=MAX_ENTRIES, CULL_INTERVAL=1, ACCESS_RESOLUTION=0
+        )
+        evicted = []
+        cache.on_evict = evicted.extend
+        cache.set('recent', 'value')
+        for number in range(MAX_ENTRIES * 2):
+            cache.set(f'key_{number}', number)
+            cache.get('recent')
+        self.assertEqual(cache.get('recent'), 'value')
+        self.assertIsNone(cache.get('key_0'))
+        self.assertEqual(cache.evictions, len(evicted))
+        self.assertIn(cache.make_key('key_0'), evicted)
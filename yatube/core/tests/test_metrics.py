@@ -0,0 +1,44 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+METRICS_URL = reverse('metrics')
+KEY = 'metric_test:{}'
+
+
+class TestCacheMetrics(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache.set(KEY.format(1), 1)
+        cache.get(KEY.format(1))
+        cache.get(KEY.format(2))
+        cache.get_many([KEY.format(1), KEY.format(3)])
+
+    def test_prometheus_endpoint(self):
+        """/metrics отдаёт счётчики по префиксам в формате Prometheus."""
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        for line in (
+            '# TYPE yatube_cache_hits_total counter',
+            'yatube_cache_hits_total{prefix="metric_test"} 2',
+            'yatube_cache_misses_total{prefix="metric_test"} 2',
+            'yatube_cache_sets_total{prefix="metric_test"} 1',
+            'yatube_cache_latency_seconds_count{prefix="metric_test"} 5',
+        ):
+            with self.subTest(line=line):
+                self.assertIn(line, content)
+
+    def test_endpoint_is_internal(self):
+        """Метрики недоступны с адресов вне INTERNAL_IPS."""
+        response = self.client.get(METRICS_URL, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    def test_command_prints_summary(self):
+        """cache_stats печатает строку по каждому префиксу."""
+        out = StringIO()
+        call_command('cache_stats', stdout=out)
+        self.assertRegex(out.getvalue(), r'metric_test +2 +2 +50\.0%')
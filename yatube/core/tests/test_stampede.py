@@ -0,0 +1,94 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from .. import stampede
+
+THREADS = 8
+KEY = 'key'
+RENDER_DELAY = 0.2
+TEMPLATE = (
+    '{% load fragments %}'
+    '{% fragment_cache 60 test_fragment version=generation %}'
+    '{{ render }}'
+    '{% endfragment_cache %}'
+)
+
+
+class SlowCounter:
+    """Считает вызовы; каждый вызов длится RENDER_DELAY секунд."""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(RENDER_DELAY)
+        return f'value {calls}'
+
+
+class TestStampede(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.compute = SlowCounter()
+
+    def run_parallel(self, func):
+        results = [None] * THREADS
+        barrier = threading.Barrier(THREADS)
+
+        def target(number):
+            barrier.wait()
+            results[number] = func()
+
+        threads = [
+            threading.Thread(target=target, args=(number,))
+            for number in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_missing_value_is_computed_once(self):
+        """Без значения в кэше его считает один поток, остальные ждут."""
+        results = self.run_parallel(
+            lambda: stampede.get_or_compute(KEY, self.compute, 60)
+        )
+        self.assertEqual(self.compute.calls, 1)
+        self.assertEqual(set(results), {('value 1', False)})
+
+    def test_expired_value_is_served_stale(self):
+        """Истёкшее значение пересчитывает один поток, другим — старое."""
+        cache.set(KEY, (None, time.time() - 1, 'old'))
+        results = self.run_parallel(
+            lambda: stampede.get_or_compute(KEY, self.compute, 60)
+        )
+        self.assertEqual(self.compute.calls, 1)
+        self.assertEqual(results.count(('value 1', False)), 1)
+        self.assertEqual(results.count(('old', True)), THREADS - 1)
+        self.assertEqual(
+            stampede.get_or_compute(KEY, self.compute, 60),
+            ('value 1', False),
+        )
+
+    def test_fragment_tag_renders_once_per_version(self):
+        """Тег fragment_cache рисует фрагмент один раз на поколение."""
+        template = Template(TEMPLATE)
+
+        def render(generation):
+            return template.render(Context({
+                'generation': generation, 'render': self.compute,
+            }))
+
+        self.assertEqual(render(1), 'value 1')
+        results = self.run_parallel(lambda: render(2))
+        self.assertEqual(self.compute.calls, 2)
+        self.assertEqual(results.count('value 2'), 1)
+        self.assertEqual(results.count('value 1'), THREADS - 1)
@@ -0,0 +1,78 @@
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .validators import validate_file_size, validate_image_pixels
+
+# Сигнатуры форматов, которые принимает сайт: JPEG, PNG, GIF, WebP.
+SIGNATURES = (
+    b'\xff\xd8\xff',
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+)
+HEADER_SIZE = 12
+
+
+def is_image_header(header):
+    """Похожи ли первые байты файла на картинку."""
+    return header.startswith(SIGNATURES) or (
+        header[:4] == b'RIFF' and header[8:12] == b'WEBP'
+    )
+
+
+class RejectedUpload(SimpleUploadedFile):
+    """Пустой файл вместо отклонённого; upload_error — причина отказа."""
+
+    def __init__(self, name, content_type, upload_error):
+        super().__init__(name, b'', content_type)
+        self.upload_error = upload_error
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загружаемые файлы на диск по частям, не держа их в памяти.
+
+    Файл отклоняется, как только по первым байтам видно, что это
+    не картинка, или как только он превысил MAX_UPLOAD_SIZE: остаток
+    запроса дочитывается без записи. Число пикселей проверяется
+    по заголовку записанного файла. Вместо отклонённого файла форма
+    получает RejectedUpload с причиной отказа.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.upload_error = None
+
+    def reject(self, upload_error):
+        self.upload_error = upload_error
+        # Временный файл удаляется при закрытии.
+        self.file.close()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload_error:
+            return None
+        self.received += len(raw_data)
+        try:
+            validate_file_size(self.received)
+        except ValidationError as error:
+            return self.reject(error.messages[0])
+        if start == 0 and not is_image_header(raw_data[:HEADER_SIZE]):
+            return self.reject(
+                'Файл не похож на картинку: загрузите JPEG, PNG, GIF '
+                'или WebP.'
+            )
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.upload_error:
+            try:
+                validate_image_pixels(self.file)
+            except ValidationError as error:
+                self.reject(error.messages[0])
+        if self.upload_error:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.upload_error
+            )
+        return super().file_complete(file_size)
@@ -0,0 +1,53 @@
+import warnings
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.images import get_image_dimensions
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+
+def validate_file_size(size):
+    if size > settings.MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл слишком большой: допускается не больше %(limit)s.',
+            code='file_too_large',
+            params={'limit': filesizeformat(settings.MAX_UPLOAD_SIZE)},
+        )
+
+
+def validate_image_pixels(file):
+    """
+    Ограничивает число пикселей картинки.
+
+    Размеры читаются из заголовка, картинка целиком не декодируется,
+    так что «бомба» из маленького файла с огромным холстом
+    отклоняется до того, как займёт память.
+    """
+    try:
+        with warnings.catch_warnings():
+            # Предупреждение Pillow о «бомбе» здесь лишнее: решаем сами.
+            warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+            width, height = get_image_dimensions(file)
+        too_large = bool(
+            width and height and width * height > settings.MAX_IMAGE_PIXELS
+        )
+    except Image.DecompressionBombError:
+        # Холст вдвое больше Image.MAX_IMAGE_PIXELS Pillow даже не открывает.
+        too_large = True
+    if too_large:
+        raise ValidationError(
+            'Картинка слишком большая: допускается не больше '
+            '%(limit)s мегапикселей.',
+            code='too_many_pixels',
+            params={'limit': settings.MAX_IMAGE_PIXELS // 10 ** 6},
+        )
+
+
+def validate_image(image):
+    """Валидатор поля модели: проверяет только новые картинки."""
+    # Уже сохранённую картинку проверять незачем, да и файла может не быть.
+    if getattr(image, '_committed', True):
+        return
+    validate_file_size(image.size)
+    validate_image_pixels(image)
@@ -1,7 +1,12 @@
 from http import HTTPStatus
 
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from . import metrics
+
 
 def page_not_found(request, exception):
     return render(
@@ -26,3 +31,13 @@ def server_error_500(request):
         'core/500.html',
         status=HTTPStatus.INTERNAL_SERVER_ERROR
     )
+
+
+def cache_metrics(request):
+    """Метрики кэша для Prometheus; доступны только с INTERNAL_IPS."""
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(
+        metrics.to_prometheus(metrics.collect(cache.backend)),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,4 +1,6 @@
 from django.contrib import admin
+
+from . import fulltext
 from .models import Comment, Follow, Group, Post
 
 
@@ -15,6 +17,11 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(fulltext.match(search_term)), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -50,4 +57,3 @@ admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
-
@@ -0,0 +1,84 @@
+from django.http import JsonResponse
+
+from core.paginator import CursorPaginator
+from .models import Post
+
+# Поля ответа и столбцы values(), из которых они берутся.
+FIELDS = {
+    'posts': {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'comments_count': 'comments_count',
+    },
+    'comments': {
+        'id': 'id',
+        'post': 'post_id',
+        'created': 'created',
+        'author': 'author__username',
+        'text': 'text',
+    },
+}
+ORDERING = {
+    'posts': ('-pub_date', '-id'),
+    'comments': ('-created', '-id'),
+}
+
+
+def parse_fields(kind, value):
+    """
+    Поля из ?fields=a,b в порядке запроса; все поля, если параметра нет.
+
+    None, если запрошено неизвестное поле.
+    """
+    if value is None:
+        return tuple(FIELDS[kind])
+    names = tuple(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()
+    ))
+    if not names or any(name not in FIELDS[kind] for name in names):
+        return None
+    return names
+
+
+def columns(kind, fields):
+    """Столбцы SELECT: запрошенные поля и ключи курсора."""
+    ordering = [field.lstrip('-') for field in ORDERING[kind]]
+    return tuple(dict.fromkeys(
+        [FIELDS[kind][name] for name in fields] + ordering
+    ))
+
+
+def get_page(kind, queryset, fields, per_page, cursor=None):
+    return CursorPaginator(
+        queryset.values(*columns(kind, fields)),
+        per_page,
+        ordering=ORDERING[kind],
+    ).get_page(cursor)
+
+
+def serialize(kind, row, fields):
+    item = {name: row[FIELDS[kind][name]] for name in fields}
+    if 'image' in item:
+        image = item['image']
+        item['image'] = (
+            Post._meta.get_field('image').storage.url(image) if image
+            else None
+        )
+    return item
+
+
+def page_response(kind, queryset, fields, per_page, cursor=None):
+    """Страница строк values() в JSON — без моделей и шаблонов."""
+    page = get_page(kind, queryset, fields, per_page, cursor)
+    return JsonResponse(
+        {
+            'results': [serialize(kind, row, fields) for row in page],
+            'next': page.next_cursor or None,
+            'previous': page.previous_cursor or None,
+        },
+        json_dumps_params={'ensure_ascii': False},
+    )
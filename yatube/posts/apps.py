@@ -3,3 +3,16 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import post_migrate
+        from PIL import Image
+
+        from . import signals
+
+        post_migrate.connect(signals.restore_fulltext, sender=self)
+
+        # Pillow откажется декодировать картинку больше лимита сайта,
+        # даже если она попала в хранилище в обход форм.
+        Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
@@ -0,0 +1,71 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from . import thumbnails
+
+KEY = 'post_card:{}:{}:{}'
+TEMPLATE = 'posts/includes/post_card.html'
+# Признаки, меняющие вид карточки на разных страницах.
+FLAGS = ('non_group', 'non_detail')
+
+
+def version(post):
+    """
+    Отпечаток полей поста, которые выводятся в карточке.
+
+    Правка поста или названия его группы даёт новый ключ, поэтому
+    карточки не нужно удалять из кэша явно.
+    """
+    group = post.group
+    fields = (
+        post.text,
+        post.image.name,
+        group and (group.slug, group.title),
+    )
+    return hashlib.md5(repr(fields).encode()).hexdigest()
+
+
+def key(post, **flags):
+    variant = ''.join(str(int(bool(flags.get(flag)))) for flag in FLAGS)
+    return KEY.format(post.pk, version(post), variant)
+
+
+def render(post, **flags):
+    return render_to_string(TEMPLATE, {'post': post, **flags})
+
+
+def render_many(posts, **flags):
+    """
+    Пары (пост, html карточки) для страницы ленты.
+
+    Готовые карточки достаются из кэша одним get_many, недостающие
+    рисуются и сохраняются одним set_many; записи об их миниатюрах
+    загружаются заранее одним запросом. Не кэшируются результаты
+    поиска с подсветкой: их текст зависит от запроса, — и карточки
+    с заглушкой вместо ещё не готовой миниатюры.
+    """
+    posts = list(posts)
+    keys = {
+        post.pk: key(post, **flags) for post in posts
+        if getattr(post, 'highlighted', None) is None
+    }
+    cards = cache.get_many(keys.values())
+    thumbnails.prefetch(
+        post.image for post in posts if keys.get(post.pk) not in cards
+    )
+    missing = {}
+    pairs = []
+    for post in posts:
+        post_key = keys.get(post.pk)
+        card = cards.get(post_key)
+        if card is None:
+            card = render(post, **flags)
+            if post_key is not None and thumbnails.ready(post.image):
+                missing[post_key] = card
+        pairs.append((post, card))
+    if missing:
+        cache.set_many(missing, settings.FEED_CACHE_TIMEOUT)
+    return pairs
@@ -0,0 +1,55 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from core import stampede
+from . import generations
+
+
+def _state(request, scopes, kwargs):
+    # ETag и Last-Modified считаются из одного чтения кэша.
+    if not hasattr(request, '_generations_state'):
+        request._generations_state = generations.state(
+            scopes(request, **kwargs)
+        )
+    return request._generations_state
+
+
+def conditional(scopes):
+    """
+    Условный GET для страниц, содержимое которых задают поколения областей.
+
+    scopes(request, **kwargs) возвращает области страницы. ETag собирается
+    из их поколений, пользователя и адреса страницы, поэтому на повторный
+    запрос с If-None-Match или If-Modified-Since ответ 304 отдаётся до
+    запросов к постам и рендера шаблонов. Браузер обязан перепроверять
+    страницу при каждом показе: она зависит от пользователя.
+    """
+    def etag(request, *args, **kwargs):
+        generation, _ = _state(request, scopes, kwargs)
+        return hashlib.md5(repr((
+            request.user.pk, request.get_full_path(), generation,
+        )).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        _, modified = _state(request, scopes, kwargs)
+        if modified is not None:
+            return datetime.fromtimestamp(modified, timezone.utc)
+
+    def decorator(view):
+        conditional_view = condition(etag, last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Устаревший фрагмент не должен закрепиться у браузера
+            # под валидаторами нового содержимого.
+            if stampede.served_stale(request):
+                del response['ETag']
+                del response['Last-Modified']
+            return response
+        return cache_control(private=True, no_cache=True)(wrapper)
+    return decorator
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+
+from .models import AuthorStats, Follow, Group
+
+KEY = 'post_count:{}'
+GLOBAL = 'global'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def scopes_for(author_id, group_id):
+    scopes = [GLOBAL, author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(group_scope(group_id))
+    return scopes
+
+
+def bump(delta):
+    """Меняет общий счётчик; отсутствующий будет оценён при чтении."""
+    try:
+        cache.incr(KEY.format(GLOBAL), delta)
+    except ValueError:
+        pass
+
+
+def bump_group(group_id, delta):
+    """Атомарно меняет Group.posts_count, не уходя ниже нуля."""
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(posts_count__gte=-delta)
+    groups.update(posts_count=F('posts_count') + delta)
+
+
+def global_count():
+    """
+    Число всех постов — сумма AuthorStats.posts_count без COUNT(*).
+
+    Сумма кэшируется на POST_COUNTER_TIMEOUT и дальше меняется bump.
+    Если bump придётся между чтением суммы и её записью, счётчик
+    ошибётся на этот пост, но не дольше срока жизни ключа.
+    """
+    key = KEY.format(GLOBAL)
+    count = cache.get(key)
+    if count is None:
+        count = AuthorStats.objects.aggregate(
+            total=Sum('posts_count')
+        )['total'] or 0
+        cache.add(key, count, settings.POST_COUNTER_TIMEOUT)
+    return count
+
+
+def follow_counter(user):
+    """
+    Число постов в ленте подписок — сумма AuthorStats авторов.
+
+    Посты обычных авторов читаются из ленты, обрезанной
+    до TIMELINE_LENGTH, поэтому их сумма ограничена этой длиной;
+    посты знаменитостей подмешиваются все.
+    """
+    def count():
+        follows = Follow.objects.filter(user=user).values_list(
+            'author__stats__posts_count', 'author__stats__followers_count'
+        )
+        timeline_count = celebrity_count = 0
+        for posts_count, followers_count in follows:
+            if (followers_count or 0) >= (
+                settings.TIMELINE_CELEBRITY_FOLLOWERS
+            ):
+                celebrity_count += posts_count or 0
+            else:
+                timeline_count += posts_count or 0
+        return min(timeline_count, settings.TIMELINE_LENGTH) + celebrity_count
+    return count
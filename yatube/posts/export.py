@@ -0,0 +1,111 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+FIELDS = {
+    'posts': (
+        'id', 'pub_date', 'author__username', 'group__slug', 'text',
+        'image', 'comments_count',
+    ),
+    'comments': ('id', 'post_id', 'created', 'author__username', 'text'),
+}
+# Строк, которые iterator() получает из базы за раз.
+CHUNK_SIZE = 2000
+# Размер блоков, которыми отдаётся вывод.
+BLOCK_SIZE = 64 * 1024
+
+
+def posts_of(author_id=None):
+    posts = Post.objects.all()
+    if author_id is not None:
+        posts = posts.filter(author_id=author_id)
+    return posts
+
+
+def comments_of(author_id=None):
+    """Комментарии к постам автора (ко всем, если автор не задан)."""
+    comments = Comment.objects.all()
+    if author_id is not None:
+        comments = comments.filter(post__author_id=author_id)
+    return comments
+
+
+def rows(kind, queryset):
+    """Словари полей FIELDS[kind] по порядку id, без создания моделей."""
+    return queryset.order_by('id').values(*FIELDS[kind]).iterator(
+        chunk_size=CHUNK_SIZE
+    )
+
+
+def to_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield '\n'
+
+
+class Echo:
+    """«Файл» для csv.writer, который возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def to_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def blocks(chunks, size=BLOCK_SIZE):
+    """Склеивает мелкие строки в байтовые блоки примерно по size байт."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        chunk = chunk.encode()
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks):
+    """Сжимает поток блоков в gzip по мере чтения."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for block in chunks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream(kind, queryset, format, gzip=False):
+    """Байтовые блоки выгрузки; память не зависит от числа строк."""
+    lines = (
+        to_ndjson(rows(kind, queryset)) if format == 'ndjson'
+        else to_csv(rows(kind, queryset), FIELDS[kind])
+    )
+    output = blocks(lines)
+    return gzipped(output) if gzip else output
+
+
+# Что выгружается: посты автора или комментарии к ним.
+KINDS = {
+    'posts': posts_of,
+    'comments': comments_of,
+}
+
+
+def filename(kind, format, gzip=False):
+    return f'{kind}.{format}' + ('.gz' if gzip else '')
@@ -0,0 +1,179 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+from django.views.decorators.http import condition
+
+from . import generations
+from .models import Group, Post, User
+from .views import group_scopes
+
+KEY = 'feed:{}'
+TITLE_LENGTH = 60
+
+
+def cached_feed(scopes):
+    """
+    Лента, закэшированная до изменения её областей (см. generations).
+
+    Поколения областей, отметки их изменения и сама лента читаются
+    одним get_many: повторный опрос получает 304 или готовый XML
+    без запросов к постам и повторной сборки ленты.
+    """
+    def state(request, kwargs):
+        if not hasattr(request, '_feed_state'):
+            key = KEY.format(hashlib.md5(
+                request.build_absolute_uri().encode()
+            ).hexdigest())
+            generation, modified, values = generations.state_with(
+                scopes(request, **kwargs), [key]
+            )
+            request._feed_state = key, generation, modified, values.get(key)
+        return request._feed_state
+
+    def etag(request, **kwargs):
+        _, generation, _, _ = state(request, kwargs)
+        return hashlib.md5(repr((
+            request.build_absolute_uri(), generation,
+        )).encode()).hexdigest()
+
+    def last_modified(request, **kwargs):
+        _, _, modified, _ = state(request, kwargs)
+        if modified is not None:
+            return datetime.fromtimestamp(modified, timezone.utc)
+
+    def decorator(feed):
+        @condition(etag, last_modified)
+        def view(request, **kwargs):
+            key, generation, _, stored = state(request, kwargs)
+            if stored is not None and stored[0] == generation:
+                return HttpResponse(stored[2], content_type=stored[1])
+            response = feed(request, **kwargs)
+            # Last-Modified задаёт condition по отметке изменения
+            # областей, одинаково для собранной и закэшированной ленты.
+            del response['Last-Modified']
+            cache.set(
+                key,
+                (generation, response['Content-Type'], response.content),
+                settings.FEED_CACHE_TIMEOUT,
+            )
+            return response
+        return view
+    return decorator
+
+
+class PostsFeed(Feed):
+    """Последние посты; подклассы задают, чьи."""
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).feed().order_by(
+            '-pub_date', '-id'
+        )[:settings.SYNDICATION_ITEMS]
+
+    def item_title(self, post):
+        return Truncator(post.text).chars(TITLE_LENGTH)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', kwargs={'post_id': post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_author_name(self, post):
+        return post.author.username
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group else []
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние обновления'
+    description = 'Новые посты всех авторов.'
+
+    def link(self):
+        return reverse('posts:index')
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def posts(self, group):
+        return group.posts.all()
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', kwargs={'slug': group.slug})
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def posts(self, author):
+        return author.posts.all()
+
+    def title(self, author):
+        return f'Yatube: посты {author.username}'
+
+    def description(self, author):
+        return f'Новые посты пользователя {author.username}.'
+
+    def link(self, author):
+        return reverse(
+            'posts:profile', kwargs={'username': author.username}
+        )
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class IndexAtomFeed(AtomMixin, IndexFeed):
+    pass
+
+
+class GroupAtomFeed(AtomMixin, GroupFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomMixin, AuthorFeed):
+    pass
+
+
+def index_scopes(request):
+    return [generations.GLOBAL]
+
+
+def author_scopes(request, username):
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    return [generations.author_scope(author.id)]
+
+
+index_rss = cached_feed(index_scopes)(IndexFeed())
+index_atom = cached_feed(index_scopes)(IndexAtomFeed())
+group_rss = cached_feed(group_scopes)(GroupFeed())
+group_atom = cached_feed(group_scopes)(GroupAtomFeed())
+author_rss = cached_feed(author_scopes)(AuthorFeed())
+author_atom = cached_feed(author_scopes)(AuthorAtomFeed())
@@ -18,6 +18,16 @@ class PostForm(forms.ModelForm):
             'image': 'Выберите картинку для поста',
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        # Обработчик загрузки заменяет отклонённый файл пустым
+        # (см. core.uploadhandlers), вместо «файл пуст» нужна причина.
+        upload_error = getattr(self.files.get('image'), 'upload_error', None)
+        if upload_error:
+            self.errors.pop('image', None)
+            self.add_error('image', upload_error)
+        return cleaned_data
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,153 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'posts_post_fts'
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    "AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    "AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    "AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+TRIGGERS = (
+    f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete', f'{FTS_TABLE}_update',
+)
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def is_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(apps=None, schema_editor=None):
+    """Создаёт индекс FTS5 с триггерами и заполняет его."""
+    using = schema_editor.connection if schema_editor else connection
+    if not is_available(using):
+        return
+    with using.cursor() as cursor:
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+    rebuild(using)
+
+
+def restore_triggers(using=connection):
+    """
+    Возвращает триггеры индекса, если их нет, и один раз пересобирает его.
+
+    Миграции, пересоздающие posts_post, на SQLite удаляют триггеры
+    вместе с таблицей; вызывается после migrate (см. PostsConfig).
+    Без самого индекса — до 0011 или после её отката — ничего не делает.
+    Возвращает True, если триггеры пришлось создать.
+    """
+    if not is_available(using):
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)',
+            (FTS_TABLE,) + TRIGGERS,
+        )
+        names = {name for name, in cursor.fetchall()}
+        if FTS_TABLE not in names or names.issuperset(TRIGGERS):
+            return False
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+    rebuild(using)
+    return True
+
+
+def uninstall(apps=None, schema_editor=None):
+    using = schema_editor.connection if schema_editor else connection
+    if not is_available(using):
+        return
+    with using.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+def rebuild(using=connection):
+    """Пересобирает индекс по текущему содержимому posts_post."""
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+        )
+
+
+def to_fts_query(text):
+    """
+    Превращает ввод пользователя в запрос FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 в вводе
+    не ломают запрос; последнее слово ищется как префикс.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def match(text):
+    """Условие «текст поста подходит под запрос» для filter()."""
+    if not is_available():
+        return Q(text__icontains=text)
+    query = to_fts_query(text)
+    if not query:
+        return Q(pk__in=())
+    return Q(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (query,),
+    ))
+
+
+def search(queryset, text):
+    """
+    Посты по запросу, от более релевантных к менее.
+
+    У каждого поста есть атрибут highlighted: текст, в котором
+    найденные слова обрамлены HIGHLIGHT_START и HIGHLIGHT_END.
+    """
+    query = to_fts_query(text)
+    if not query:
+        return queryset.none()
+    if not is_available():
+        return queryset.filter(text__icontains=text).extra(
+            select={'highlighted': 'posts_post.text'}
+        )
+    return queryset.extra(
+        select={
+            'rank': f'bm25({FTS_TABLE})',
+            'highlighted': f'highlight({FTS_TABLE}, 0, %s, %s)',
+        },
+        select_params=(HIGHLIGHT_START, HIGHLIGHT_END),
+        tables=(FTS_TABLE,),
+        where=(
+            f'{FTS_TABLE}.rowid = posts_post.id',
+            f'{FTS_TABLE} MATCH %s',
+        ),
+        params=(query,),
+    ).order_by('rank', '-pub_date')
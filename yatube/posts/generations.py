@@ -0,0 +1,81 @@
+import time
+
+from django.core.cache import cache
+
+# Области лент те же, что у счётчиков постов.
+from .counters import (  # noqa: F401
+    GLOBAL, author_scope, group_scope, scopes_for,
+)
+
+KEY = 'generation:{}'
+MODIFIED_KEY = 'modified:{}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def scopes_for_post(post):
+    """Ленты, в которых виден пост, и страница самого поста."""
+    return scopes_for(post.author_id, post.group_id) + [post_scope(post.pk)]
+
+
+def follows_scope(user_id):
+    """Подписки и подписчики пользователя, выводимые в профиле."""
+    return f'follows:{user_id}'
+
+
+def _initial():
+    # Потерянный при вытеснении номер начинается заново со времени
+    # в миллисекундах, поэтому он больше любого выданного раньше и не
+    # совпадает с ключами ещё живых фрагментов.
+    return int(time.time() * 1000)
+
+
+def current(scope):
+    """Номер поколения области; входит в ключи её кэшированных фрагментов."""
+    key = KEY.format(scope)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def state(scopes):
+    """
+    Номера поколений областей и время последнего изменения любой из них.
+
+    Время неизвестно, если отметка вытеснена из кэша.
+    """
+    generations, modified, _ = state_with(scopes, ())
+    return generations, modified
+
+
+def state_with(scopes, keys):
+    """То же, что state, и значения ключей keys — одним чтением кэша."""
+    generation_keys = [KEY.format(scope) for scope in scopes]
+    modified_keys = [MODIFIED_KEY.format(scope) for scope in scopes]
+    values = cache.get_many(generation_keys + modified_keys + list(keys))
+    generations = [
+        values[key] if key in values else current(scope)
+        for key, scope in zip(generation_keys, scopes)
+    ]
+    extra = {key: values[key] for key in keys if key in values}
+    if not all(key in values for key in modified_keys):
+        return generations, None, extra
+    return generations, max(values[key] for key in modified_keys), extra
+
+
+def bump(scopes):
+    """Делает устаревшими все фрагменты указанных областей."""
+    for scope in scopes:
+        key = KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial(), None)
+    now = time.time()
+    cache.set_many(
+        {MODIFIED_KEY.format(scope): now for scope in scopes}, None
+    )
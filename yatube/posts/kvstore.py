@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    EMPTY_VALUE, KVStore as CachedDBKVStore,
+)
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+# Готовая миниатюра не меняется, но может быть удалена из другого процесса.
+TIMEOUT = 60 * 5
+# Миниатюру, которой ещё нет, может создать пул другого процесса.
+MISSING_TIMEOUT = 5
+
+
+class KVStore(CachedDBKVStore):
+    """
+    Хранилище sorl с LRU-кэшем в памяти процесса перед общим кэшем и базой.
+
+    prefetch() загружает записи для многих миниатюр сразу: из общего
+    кэша одним get_many, недостающие — одним запросом к базе.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, value):
+        timeout = MISSING_TIMEOUT if value is EMPTY_VALUE else TIMEOUT
+        with self._lock:
+            self._local[key] = (value, time.monotonic() + timeout)
+            self._local.move_to_end(key)
+            while len(self._local) > settings.THUMBNAIL_LOCAL_CACHE_SIZE:
+                self._local.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def prefetch(self, image_files):
+        """Загружает записи миниатюр, которых ещё нет в памяти процесса."""
+        keys = {
+            add_prefix(image_file.key) for image_file in image_files
+        }
+        keys = [key for key in keys if self._recall(key) is None]
+        if not keys:
+            return
+        values = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in values]
+        if missing:
+            found = dict(KVStoreModel.objects.filter(
+                key__in=missing
+            ).values_list('key', 'value'))
+            loaded = {key: found.get(key, EMPTY_VALUE) for key in missing}
+            self.cache.set_many(loaded, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+            values.update(loaded)
+        for key, value in values.items():
+            self._remember(key, value)
+
+    def _get_raw(self, key):
+        entry = self._recall(key)
+        if entry is None:
+            value = super()._get_raw(key)
+            self._remember(key, EMPTY_VALUE if value is None else value)
+            return value
+        value, _ = entry
+        return None if value == EMPTY_VALUE else value
+
+    def _set_raw(self, key, value):
+        super()._set_raw(key, value)
+        self._remember(key, value)
+
+    def _delete_raw(self, *keys):
+        super()._delete_raw(*keys)
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
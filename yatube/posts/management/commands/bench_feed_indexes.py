@@ -0,0 +1,140 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts import timeline
+from posts.models import Comment, Follow, Group, Post, User
+
+USERNAME_PREFIX = 'bench_index_'
+INDEXED_MODELS = (Post, Comment, Follow)
+# Больше строк SQLite не принимает в одном составном INSERT Django 2.2.
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу большим набором данных и печатает EXPLAIN QUERY '
+        'PLAN и время запросов лент без составных индексов и с ними. '
+        'Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--authors', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан на SQLite.')
+        random.seed(options['seed'])
+        with transaction.atomic():
+            probes = self.seed(options)
+            after = self.measure(probes, options['repeat'], 'after')
+            self.drop_indexes()
+            before = self.measure(probes, options['repeat'], 'before')
+            transaction.set_rollback(True)
+        for name, _ in probes:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, results in (('до', before), ('после', after)):
+                plan, elapsed = results[name]
+                self.stdout.write(f'  {label}: {elapsed:.3f} мс')
+                for line in plan:
+                    self.stdout.write(f'    {line}')
+
+    def seed(self, options):
+        self.stdout.write('Заполнение базы...')
+        User.objects.bulk_create(
+            User(username=f'{USERNAME_PREFIX}{number}')
+            for number in range(options['authors'])
+        )
+        users = list(User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ))
+        Group.objects.bulk_create(
+            Group(title=f'Группа {number}', slug=f'{USERNAME_PREFIX}{number}')
+            for number in range(options['groups'])
+        )
+        groups = list(Group.objects.filter(
+            slug__startswith=USERNAME_PREFIX
+        ))
+        Post.objects.bulk_create(
+            (
+                Post(
+                    text=f'Пост {number}',
+                    author=random.choice(users),
+                    group=random.choice(groups + [None]),
+                )
+                for number in range(options['posts'])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        post_ids = list(Post.objects.filter(
+            author__in=users
+        ).values_list('id', flat=True))
+        post = random.choice(post_ids)
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    text=f'Комментарий {number}',
+                    author=random.choice(users),
+                    post_id=post if number % 2 else random.choice(post_ids),
+                )
+                for number in range(options['comments'])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        reader, *authors = random.sample(users, 21)
+        Follow.objects.bulk_create(
+            Follow(user=user, author=author)
+            for author in authors
+            for user in users
+            if user != author
+        )
+        for author in authors:
+            timeline.backfill(reader.pk, author.pk)
+        author = authors[0]
+        page = settings.POSTS_ON_PAGES
+        return [
+            ('index', Post.objects.feed()[:page]),
+            ('group_posts_list', groups[0].posts.feed()[:page]),
+            ('profile', author.posts.feed()[:page]),
+            ('follow_index', timeline.feed_for(reader)[:page]),
+            ('post_detail comments', Comment.objects.filter(post=post)[:50]),
+            ('profile following', Follow.objects.filter(
+                author=author, user=reader
+            )[:1]),
+            ('followers', Follow.objects.filter(
+                author=author
+            ).values_list('user', flat=True)),
+        ]
+
+    def measure(self, probes, repeat, label):
+        results = {}
+        with connection.cursor() as cursor:
+            for name, queryset in probes:
+                sql, params = queryset.query.sql_with_params()
+                # Метка не даёт sqlite3 взять план из кэша выражений,
+                # подготовленного до удаления индексов.
+                sql = f'{sql} /* {label} */'
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = [row[-1] for row in cursor.fetchall()]
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[name] = plan, min(timings)
+        return results
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX "{index.name}"')
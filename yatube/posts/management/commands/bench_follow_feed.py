@@ -0,0 +1,111 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from posts import timeline
+from posts.models import AuthorStats, Follow, Post, TimelineEntry, User
+
+USERNAME_PREFIX = 'bench_feed_'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет усиление записи и время чтения ленты подписок '
+        'при разных порогах «знаменитости». Данные создаются '
+        'в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=2000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Подписок на одного читателя.')
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--reads', type=int, default=200)
+        parser.add_argument(
+            '--thresholds', type=int, nargs='+',
+            default=[10 ** 9, 1000, 200, 50],
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.stdout.write(
+            f'{"порог":>12} {"знаменитостей":>14} {"записей/пост":>13} '
+            f'{"мс/пост":>11} {"чтение p50, мс":>15} '
+            f'{"чтение p95, мс":>15}'
+        )
+        with transaction.atomic():
+            readers, authors = self.seed(options)
+            for threshold in options['thresholds']:
+                with override_settings(
+                    TIMELINE_CELEBRITY_FOLLOWERS=threshold
+                ):
+                    self.run_round(threshold, readers, authors, options)
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        User.objects.bulk_create(
+            User(username=f'{USERNAME_PREFIX}{number}')
+            for number in range(options['readers'] + options['authors'])
+        )
+        users = list(User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).order_by('pk'))
+        authors = users[:options['authors']]
+        readers = users[options['authors']:]
+        # Распределение по закону Ципфа: у первых авторов больше всего
+        # подписчиков, у последних — единицы.
+        weights = [1 / rank for rank in range(1, len(authors) + 1)]
+        follows = set()
+        for reader in readers:
+            for author in random.choices(
+                authors, weights, k=options['follows']
+            ):
+                follows.add((reader.pk, author.pk))
+        Follow.objects.bulk_create(
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in follows
+        )
+        AuthorStats.objects.filter(
+            user__username__startswith=USERNAME_PREFIX
+        ).delete()
+        AuthorStats.objects.bulk_create(AuthorStats.objects.recount(
+            user_ids=[user.pk for user in users]
+        ))
+        return readers, authors
+
+    def run_round(self, threshold, readers, authors, options):
+        TimelineEntry.objects.filter(user__in=readers).delete()
+        Post.objects.filter(author__in=authors).delete()
+        celebrities = sum(
+            timeline.is_celebrity(author.pk) for author in authors
+        )
+        before = TimelineEntry.objects.count()
+        started = time.perf_counter()
+        for number in range(options['posts']):
+            Post.objects.create(
+                text=f'Пост {number}', author=random.choice(authors)
+            )
+        write_ms = (time.perf_counter() - started) * 1000
+        entries = TimelineEntry.objects.count() - before
+        timings = []
+        for reader in random.sample(
+            readers, min(options['reads'], len(readers))
+        ):
+            started = time.perf_counter()
+            list(timeline.feed_for(reader)[:settings.POSTS_ON_PAGES])
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f'{threshold:>12} {celebrities:>14} '
+            f'{entries / options["posts"]:>13.1f} '
+            f'{write_ms / options["posts"]:>11.2f} '
+            f'{statistics.median(timings):>15.2f} '
+            f'{timings[int(len(timings) * 0.95) - 1]:>15.2f}'
+        )
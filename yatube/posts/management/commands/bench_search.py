@@ -0,0 +1,103 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts import fulltext
+from posts.models import Post, User
+
+USERNAME = 'bench_search'
+WORDS = (
+    'пост', 'группа', 'автор', 'лента', 'подписка', 'комментарий',
+    'django', 'python', 'sqlite', 'индекс', 'поиск', 'кэш', 'запрос',
+    'страница', 'картинка', 'профиль', 'новость', 'история', 'фото',
+    'путешествие', 'горы', 'море', 'город', 'книга', 'музыка', 'кино',
+)
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск через FTS5 с поиском через LIKE. '
+        'Посты создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--words', type=int, default=30,
+                            help='Слов в тексте поста.')
+        parser.add_argument('--vocabulary', type=int, default=5000,
+                            help='Дополнительных слов в словаре.')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument(
+            '--queries', nargs='+',
+            default=['горы', 'море город', 'путешеств', 'нетакогослова'],
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not fulltext.is_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        random.seed(options['seed'])
+        with transaction.atomic():
+            self.seed(options)
+            self.stdout.write(
+                f'{"запрос":<16} {"найдено":>9} {"LIKE, мс":>10} '
+                f'{"FTS5, мс":>10}'
+            )
+            for query in options['queries']:
+                self.compare(query, options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        self.stdout.write(f'Создание {options["posts"]} постов...')
+        author = User.objects.create(username=USERNAME)
+        vocabulary = WORDS + tuple(
+            f'слово{number}' for number in range(options['vocabulary'])
+        )
+        started = time.perf_counter()
+        # Вставка идёт мимо ORM: сигналы и bulk_create сделали бы
+        # наполнение дольше самого замера. Индекс наполняют триггеры.
+        with connection.cursor() as cursor:
+            for offset in range(0, options['posts'], BATCH_SIZE):
+                size = min(BATCH_SIZE, options['posts'] - offset)
+                cursor.executemany(
+                    'INSERT INTO posts_post (text, pub_date, author_id, '
+                    "image, comments_count) "
+                    "VALUES (%s, datetime('now'), %s, '', 0)",
+                    [
+                        (' '.join(random.choices(
+                            vocabulary, k=options['words']
+                        )), author.pk)
+                        for _ in range(size)
+                    ],
+                )
+        self.stdout.write(
+            f'Готово за {time.perf_counter() - started:.1f} с.'
+        )
+
+    def compare(self, query, repeat):
+        page = settings.POSTS_ON_PAGES
+        words = query.split()
+        like = Post.objects.feed()
+        for word in words:
+            like = like.filter(text__icontains=word)
+        fts = fulltext.search(Post.objects.feed(), query)
+        like_ms = self.timeit(lambda: (like.count(), list(like[:page])),
+                              repeat)
+        fts_ms = self.timeit(lambda: (fts.count(), list(fts[:page])),
+                             repeat)
+        self.stdout.write(
+            f'{query:<16} {fts.count():>9} {like_ms:>10.1f} {fts_ms:>10.1f}'
+        )
+
+    @staticmethod
+    def timeit(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings)
@@ -0,0 +1,174 @@
+import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from core.cache import MAX_VARIABLES
+from core.models import Blob
+from posts import thumbnails
+from posts.models import Post
+
+# Файлы моложе этого могли быть только что загружены: пост, который
+# на них сошлётся, ещё не сохранён.
+MIN_AGE = 60 * 60
+
+
+def scan(root, directory):
+    """Файлы под directory: имя относительно root → (размер, mtime)."""
+    found = {}
+    directories = [directory]
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = os.scandir(os.path.join(root, directory))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = posixpath.join(directory, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    found[name] = (stat.st_size, stat.st_mtime)
+    return found
+
+
+def walk(executor, root, directory):
+    """
+    Обходит подкаталоги directory параллельно.
+
+    Возвращает функцию, которая дождётся обхода и вернёт все файлы.
+    """
+    try:
+        entries = list(os.scandir(os.path.join(root, directory)))
+    except FileNotFoundError:
+        entries = []
+    files = {}
+    futures = []
+    for entry in entries:
+        name = posixpath.join(directory, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            futures.append(executor.submit(scan, root, name))
+        elif entry.is_file(follow_symlinks=False):
+            stat = entry.stat(follow_symlinks=False)
+            files[name] = (stat.st_size, stat.st_mtime)
+
+    def result():
+        for future in futures:
+            files.update(future.result())
+        return files
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов и миниатюры, на которые не ссылается '
+        'ни один пост: остатки удалённых и отредактированных постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=0,
+            help='Не больше стольких удалений в секунду; 0 — без ограничения.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=MIN_AGE,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Потоков для обхода каталогов.',
+        )
+        parser.add_argument(
+            '--every',
+            type=int,
+            default=0,
+            help='Повторять раз в столько секунд; 0 — выполнить один раз.',
+        )
+
+    def handle(self, *args, every=0, **options):
+        while True:
+            self.collect(**options)
+            if not every:
+                return
+            time.sleep(every)
+
+    def live_names(self):
+        """Картинки постов и имена всех их миниатюр."""
+        images, thumbnail_names = set(), set()
+        posts = Post.objects.exclude(image='').only('image')
+        for post in posts.iterator():
+            images.add(post.image.name)
+            thumbnail_names.update(
+                thumbnails.backend.thumbnail_file(
+                    post.image, geometry, **options
+                ).name
+                for geometry, options in thumbnails.geometries()
+            )
+        return images, thumbnail_names
+
+    def collect(self, dry_run, rate, min_age, workers, **options):
+        image_storage = Post._meta.get_field('image').storage
+        upload_to = Post._meta.get_field('image').upload_to.rstrip('/')
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            image_files = walk(executor, image_storage.location, upload_to)
+            thumbnail_files = walk(
+                executor, default.storage.location,
+                sorl_settings.THUMBNAIL_PREFIX.rstrip('/'),
+            )
+            # Ссылки читаются, пока идёт обход: файл, на который за это
+            # время сослался новый пост, моложе min_age и не тронут.
+            images, thumbnail_names = self.live_names()
+            image_files, thumbnail_files = image_files(), thumbnail_files()
+        deadline = time.time() - min_age
+        orphans = [
+            (image_storage, name, size)
+            for name, (size, mtime) in sorted(image_files.items())
+            if name not in images and mtime < deadline
+        ] + [
+            (default.storage, name, size)
+            for name, (size, mtime) in sorted(thumbnail_files.items())
+            if name not in thumbnail_names and mtime < deadline
+        ]
+        reclaimed = 0
+        for storage, name, size in orphans:
+            self.stdout.write(f'{name}: {filesizeformat(size)}')
+            reclaimed += size
+            if dry_run:
+                continue
+            storage.delete(name)
+            default.kvstore.delete(ImageFile(name, storage), False)
+            if rate:
+                time.sleep(1 / rate)
+        if not dry_run:
+            names = [name for _, name, _ in orphans]
+            for start in range(0, len(names), MAX_VARIABLES):
+                Blob.objects.filter(
+                    name__in=names[start:start + MAX_VARIABLES]
+                ).delete()
+        summary = (
+            f'Лишних файлов: {len(orphans)}, '
+            f'{filesizeformat(reclaimed)}.'
+        )
+        if dry_run:
+            self.stdout.write(summary)
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary} Удалено.'))
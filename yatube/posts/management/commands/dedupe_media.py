@@ -0,0 +1,109 @@
+import os
+import shutil
+from collections import Counter
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
+
+from core.models import Blob
+from posts import generations, thumbnails
+from posts.models import Post
+
+
+def link(source, target):
+    """Жёсткая ссылка вместо копии; копия — если ФС ссылок не умеет."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки постов, загруженные до хранилища по '
+        'содержимому, под имена из SHA-256: одинаковые файлы остаются '
+        'в одном экземпляре. Затем пересчитывает ссылки на файлы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет перенесено.',
+        )
+
+    def plan(self, storage):
+        """Новые имена старых загрузок и сколько байт займут дубликаты."""
+        legacy = {
+            name for name in Post.objects.exclude(image='').values_list(
+                'image', flat=True
+            ).iterator()
+            if not storage.is_hashed(name)
+        }
+        renames, targets, reclaimed = {}, set(), 0
+        for name in sorted(legacy):
+            try:
+                exists = storage.exists(name)
+            except SuspiciousFileOperation:
+                exists = False
+            if not exists:
+                self.stderr.write(f'{name}: файла нет в MEDIA_ROOT, пропущен')
+                continue
+            with storage.open(name) as content:
+                hashed = storage.hashed_name(name, content)
+            if hashed in targets or storage.exists(hashed):
+                reclaimed += storage.size(name)
+            renames[name] = hashed
+            targets.add(hashed)
+            self.stdout.write(f'{name} -> {hashed}')
+        return renames, reclaimed
+
+    def apply(self, storage, renames):
+        # Новое имя появляется до того, как на него сошлются посты,
+        # а старое удаляется только после коммита.
+        for name, hashed in renames.items():
+            link(storage.path(name), storage.path(hashed))
+        with transaction.atomic():
+            for name, hashed in renames.items():
+                Post.objects.filter(image=name).update(image=hashed)
+            references = Counter(
+                name for name in Post.objects.exclude(
+                    image=''
+                ).values_list('image', flat=True).iterator()
+                if storage.is_hashed(name)
+            )
+            Blob.objects.all().delete()
+            Blob.objects.bulk_create(
+                (
+                    Blob(name=name, references=count)
+                    for name, count in references.items()
+                ),
+                batch_size=500,
+            )
+        for name in renames:
+            storage.delete(name)
+        scopes = set()
+        posts = Post.objects.filter(image__in=set(renames.values()))
+        for post in posts.only('pk', 'author_id', 'group_id').iterator():
+            scopes.update(generations.scopes_for_post(post))
+            # Миниатюры ищутся по имени картинки, у нового имени их нет.
+            thumbnails.schedule(post.pk)
+        generations.bump(sorted(scopes))
+
+    def handle(self, *args, dry_run=False, **options):
+        storage = Post._meta.get_field('image').storage
+        renames, reclaimed = self.plan(storage)
+        summary = (
+            f'Файлов: {len(renames)}, дубликатов освободят '
+            f'{filesizeformat(reclaimed)}.'
+        )
+        if dry_run:
+            self.stdout.write(summary)
+            return
+        self.apply(storage, renames)
+        self.stdout.write(self.style.SUCCESS(summary))
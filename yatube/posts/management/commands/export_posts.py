@@ -0,0 +1,61 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты (или комментарии к ним) всего сайта или одного '
+        'автора в NDJSON или CSV, при необходимости сжимая в gzip.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--author',
+            help='Имя автора; по умолчанию — все посты сайта.',
+        )
+        parser.add_argument(
+            '--comments',
+            action='store_true',
+            help='Выгрузить комментарии к постам вместо самих постов.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=export.FORMATS,
+            default='ndjson',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать вывод в gzip.',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Файл для выгрузки; по умолчанию — стандартный вывод.',
+        )
+
+    def handle(self, *args, author=None, comments=False, format='ndjson',
+               gzip=False, output=None, **options):
+        author_id = None
+        if author is not None:
+            author_id = User.objects.filter(username=author).values_list(
+                'pk', flat=True
+            ).first()
+            if author_id is None:
+                raise CommandError(f'Нет пользователя «{author}».')
+        kind = 'comments' if comments else 'posts'
+        blocks = export.stream(
+            kind, export.KINDS[kind](author_id), format, gzip
+        )
+        stream = open(output, 'wb') if output else sys.stdout.buffer
+        try:
+            for block in blocks:
+                stream.write(block)
+        finally:
+            if output:
+                stream.close()
+            else:
+                stream.flush()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт недостающие миниатюры картинок постов, например '
+        'для постов, опубликованных до фоновой генерации.'
+    )
+
+    def handle(self, *args, **options):
+        created = 0
+        posts = Post.objects.exclude(image='').only('image')
+        for post in posts.iterator():
+            # Проверяются и варианты для srcset: у постов, обработанных
+            # до их появления, есть только основные миниатюры.
+            if not thumbnails.ready(post.image):
+                thumbnails.generate(post.pk)
+                created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюры созданы для {created} постов.'
+        ))
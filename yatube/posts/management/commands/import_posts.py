@@ -0,0 +1,258 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.images import get_image_dimensions
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import MAX_VARIABLES
+from core.uploadhandlers import HEADER_SIZE, is_image_header
+from core.validators import validate_file_size, validate_image_pixels
+from posts import counters, generations, thumbnails, timeline
+from posts.models import AuthorStats, Follow, Group, Post, User
+
+STATS_FIELDS = ('posts_count', 'followers_count', 'following_count')
+
+
+def read_jsonl(stream):
+    """
+    Непустые строки файла с номерами.
+
+    Разбираются они в Command.build, чтобы испорченная строка
+    пропускалась, а не прерывала импорт.
+    """
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            yield number, line
+
+
+def parse_jsonl(line):
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError('строка не JSON-объект')
+    return row
+
+
+def read_csv(stream):
+    yield from enumerate(csv.DictReader(stream), 1)
+
+
+READERS = {
+    'jsonl': (read_jsonl, parse_jsonl),
+    'csv': (read_csv, dict),
+}
+
+
+def parse_pub_date(value):
+    """Дата из ISO 8601; без часового пояса — в поясе сайта."""
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise ValueError('дата не в формате ISO 8601')
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+@contextmanager
+def keep_pub_date():
+    """Даёт сохранить дату публикации из файла вместо auto_now_add."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV с полями text, author '
+        '(имя пользователя) и необязательными group (slug), pub_date '
+        '(ISO 8601) и image (файл в каталоге --images).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами.')
+        parser.add_argument(
+            '--format',
+            choices=READERS,
+            help='Формат файла; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--images',
+            help='Каталог, относительно которого указаны картинки.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Постов в одном INSERT.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Постов в одной транзакции.',
+        )
+
+    def handle(self, path, format=None, images=None, **options):
+        format = format or os.path.splitext(path)[1].lstrip('.').lower()
+        if format not in READERS:
+            raise CommandError(
+                f'Неизвестный формат «{format}», укажите --format.'
+            )
+        self.images = images
+        reader, self.parse = READERS[format]
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.skipped = 0
+        self.scopes = Counter()
+        self.group_posts = Counter()
+        self.author_ids = set()
+        self.image_names = []
+        started = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as stream:
+            posts = filter(None, (
+                self.build(number, record)
+                for number, record in reader(stream)
+            ))
+            imported = self.insert(posts, **options)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, пропущено: {self.skipped} '
+            f'за {elapsed:.1f} с ({imported / max(elapsed, 1e-6) * 60:.0f} '
+            'в минуту).'
+        ))
+
+    def skip(self, number, reason):
+        self.skipped += 1
+        self.stderr.write(f'Строка {number}: {reason}, пропущена')
+
+    def build(self, number, record):
+        """Несохранённый пост из строки файла или None."""
+        try:
+            row = self.parse(record)
+        except ValueError as error:
+            return self.skip(number, f'не разобрана ({error})')
+        author_id = self.authors.get(row.get('author'))
+        if author_id is None:
+            return self.skip(number, f'нет автора «{row.get("author")}»')
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                return self.skip(number, f'нет группы «{row["group"]}»')
+        if not row.get('text'):
+            return self.skip(number, 'нет текста')
+        try:
+            pub_date = (
+                parse_pub_date(row['pub_date']) if row.get('pub_date')
+                else timezone.now()
+            )
+            image = self.save_image(row['image']) if row.get('image') else ''
+        except (OSError, ValueError) as error:
+            return self.skip(number, error)
+        post = Post(
+            text=row['text'], author_id=author_id, group_id=group_id,
+            pub_date=pub_date, image=image,
+        )
+        self.scopes.update(counters.scopes_for(author_id, group_id))
+        if group_id is not None:
+            self.group_posts[group_id] += 1
+        self.author_ids.add(author_id)
+        return post
+
+    def save_image(self, name):
+        if self.images is None:
+            raise ValueError(f'картинка {name}: не указан каталог --images')
+        with open(os.path.join(self.images, name), 'rb') as stream:
+            image = File(stream, name=os.path.basename(name))
+            # Те же проверки, что у загрузки через сайт.
+            if not is_image_header(stream.read(HEADER_SIZE)) or (
+                None in get_image_dimensions(image)
+            ):
+                raise ValueError(f'{name} не похож на картинку')
+            try:
+                validate_file_size(image.size)
+                validate_image_pixels(image)
+            except ValidationError as error:
+                raise ValueError(f'картинка {name}: {error.messages[0]}')
+            field = Post._meta.get_field('image')
+            saved = field.storage.save(
+                field.generate_filename(None, image.name), image
+            )
+        self.image_names.append(saved)
+        return saved
+
+    def insert(self, posts, batch_size, chunk_size, **options):
+        """
+        Сохраняет посты пачками, каждые chunk_size — в своей транзакции
+        вместе с производными данными: импорт, прерванный на середине,
+        оставляет сохранённые посты согласованными.
+        """
+        imported = 0
+        with keep_pub_date():
+            while True:
+                chunk = list(islice(posts, chunk_size))
+                if not chunk:
+                    return imported
+                with transaction.atomic():
+                    Post.objects.bulk_create(chunk, batch_size=batch_size)
+                    self.finish()
+                imported += len(chunk)
+                self.stdout.write(f'Сохранено постов: {imported}')
+
+    def schedule_thumbnails(self):
+        """Ставит миниатюры картинок пачки в очередь после её коммита."""
+        post_ids = []
+        for start in range(0, len(self.image_names), MAX_VARIABLES):
+            post_ids += Post.objects.filter(
+                image__in=self.image_names[start:start + MAX_VARIABLES]
+            ).values_list('pk', flat=True)
+
+        def schedule():
+            for post_id in post_ids:
+                thumbnails.schedule(post_id)
+        transaction.on_commit(schedule)
+
+    def finish(self):
+        """
+        Обновляет для сохранённой пачки то, что при обычном сохранении
+        делают сигналы: bulk_create их не отправляет.
+        """
+        author_ids = sorted(self.author_ids)
+        # Подписки выбираются по двум спискам id сразу (см. recount).
+        step = MAX_VARIABLES // 2
+        for start in range(0, len(author_ids), step):
+            chunk = author_ids[start:start + step]
+            stats = AuthorStats.objects.recount(user_ids=chunk)
+            AuthorStats.objects.bulk_create(stats, ignore_conflicts=True)
+            AuthorStats.objects.bulk_update(
+                stats, STATS_FIELDS, batch_size=500
+            )
+            follows = Follow.objects.filter(author__in=chunk).values_list(
+                'user', 'author'
+            )
+            for user_id, author_id in follows.iterator():
+                timeline.backfill(user_id, author_id)
+        storage = Post._meta.get_field('image').storage
+        for name in self.image_names:
+            storage.retain(name)
+        self.schedule_thumbnails()
+        counters.bump(self.scopes[counters.GLOBAL])
+        for group_id, count in self.group_posts.items():
+            counters.bump_group(group_id, count)
+        generations.bump(sorted(self.scopes))
+        self.author_ids.clear()
+        self.image_names.clear()
+        self.scopes.clear()
+        self.group_posts.clear()
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import AuthorStats
+
+COUNTERS = ('posts_count', 'followers_count', 'following_count')
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики авторов с нуля '
+        'и сообщает о расхождениях с сохранёнными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, ничего не сохраняя.',
+        )
+
+    def handle(self, *args, check=False, **options):
+        with transaction.atomic():
+            current = AuthorStats.objects.select_for_update().in_bulk()
+            missing, drifted = [], []
+            for stats in AuthorStats.objects.recount():
+                stored = current.get(stats.user_id)
+                if stored is None:
+                    missing.append(stats)
+                    self.stdout.write(
+                        f'user={stats.user_id}: нет строки счётчиков'
+                    )
+                    continue
+                changes = [
+                    f'{field} {getattr(stored, field)} -> '
+                    f'{getattr(stats, field)}'
+                    for field in COUNTERS
+                    if getattr(stored, field) != getattr(stats, field)
+                ]
+                if changes:
+                    drifted.append(stats)
+                    self.stdout.write(
+                        f'user={stats.user_id}: ' + ', '.join(changes)
+                    )
+            if not check:
+                AuthorStats.objects.bulk_create(missing)
+                AuthorStats.objects.bulk_update(drifted, COUNTERS)
+        summary = (
+            f'Без строки: {len(missing)}, с расхождением: {len(drifted)}.'
+        )
+        if check:
+            self.stdout.write(summary)
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary} Исправлено.'))
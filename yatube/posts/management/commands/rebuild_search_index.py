@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import fulltext
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов FTS5.'
+
+    def handle(self, *args, **options):
+        if not fulltext.is_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        fulltext.install()
+        self.stdout.write(self.style.SUCCESS('Индекс пересобран.'))
@@ -0,0 +1,52 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+
+from posts import thumbnails
+from posts.models import Post
+
+NAME = 'card'
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает, сколько байт экономят адаптивные варианты картинок '
+        'по сравнению с единственной миниатюрой JPEG для карточки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--generate', action='store_true',
+                            help='Сначала создать недостающие варианты.')
+
+    def handle(self, *args, **options):
+        baseline = Counter()
+        variants = Counter()
+        posts = 0
+        for post in Post.objects.exclude(image='').only('image').iterator():
+            if options['generate'] and not thumbnails.ready(post.image):
+                thumbnails.generate(post.pk)
+            card = thumbnails.lookup(post.image, NAME)
+            found = thumbnails.lookup_variants(post.image, NAME)
+            if card is None or not found:
+                continue
+            posts += 1
+            card_size = default.storage.size(card.name)
+            for image_format, images in found.items():
+                for width, image in images:
+                    baseline[width, image_format] += card_size
+                    variants[width, image_format] += default.storage.size(
+                        image.name
+                    )
+        self.stdout.write(f'Постов с готовыми вариантами: {posts}')
+        self.stdout.write(
+            f'{"ширина":>7} {"формат":>7} {"было, КБ":>10} '
+            f'{"стало, КБ":>10} {"экономия":>9}'
+        )
+        for width, image_format in sorted(baseline):
+            before = baseline[width, image_format]
+            after = variants[width, image_format]
+            self.stdout.write(
+                f'{width:>7} {image_format:>7} {before / 1024:>10.1f} '
+                f'{after / 1024:>10.1f} {1 - after / before:>9.1%}'
+            )
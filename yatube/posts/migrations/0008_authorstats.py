@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:56
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_author_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    posts_count = dict(
+        Post.objects.order_by().values_list('author').annotate(Count('pk'))
+    )
+    followers_count = dict(
+        Follow.objects.order_by().values_list('author').annotate(Count('pk'))
+    )
+    following_count = dict(
+        Follow.objects.order_by().values_list('user').annotate(Count('pk'))
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(
+            user_id=user_id,
+            posts_count=posts_count.get(user_id, 0),
+            followers_count=followers_count.get(user_id, 0),
+            following_count=following_count.get(user_id, 0),
+        )
+        for user_id in User.objects.values_list('pk', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0007_auto_20220501_2028'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Всего постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Всего подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Всего подписок')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
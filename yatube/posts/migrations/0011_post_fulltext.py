@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from posts import fulltext
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fulltext.install, fulltext.uninstall),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:21
+
+import core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_fulltext'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', validators=[core.validators.validate_image], verbose_name='Картинка'),
+        ),
+    ]
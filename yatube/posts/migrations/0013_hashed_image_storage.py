@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:24
+
+import core.storage
+import core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('posts', '0012_post_image_validators'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.HashedStorage(), upload_to='posts/', validators=[core.validators.validate_image], verbose_name='Картинка'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comments_count(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    counts = Comment.objects.order_by().values_list('post').annotate(
+        Count('pk')
+    )
+    for post_id, comments_count in counts.iterator():
+        Post.objects.filter(pk=post_id).update(comments_count=comments_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_hashed_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Всего комментариев'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
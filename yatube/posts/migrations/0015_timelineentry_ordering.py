@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_post_comments_count'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='timelineentry',
+            options={'ordering': ('-pub_date', '-post_id'), 'verbose_name': 'Запись ленты', 'verbose_name_plural': 'Записи ленты'},
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:04
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_posts_count(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    counts = Post.objects.filter(group__isnull=False).order_by().values_list(
+        'group'
+    ).annotate(Count('pk'))
+    for group_id, posts_count in counts.iterator():
+        Group.objects.filter(pk=group_id).update(posts_count=posts_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_timelineentry_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Всего постов'),
+        ),
+        migrations.RunPython(fill_posts_count, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Count, F
 
 from core.models import CreatedModel
+from core.storage import HashedStorage
+from core.validators import validate_image
 
 User = get_user_model()
 
@@ -20,6 +23,12 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание группы',
     )
+    # Денормализованный счётчик: лента группы не считает посты.
+    posts_count = models.PositiveIntegerField(
+        'Всего постов',
+        default=0,
+        editable=False,
+    )
 
     def __str__(self):
         return self.title
@@ -29,6 +38,19 @@ class Group(models.Model):
         verbose_name_plural = 'Группы'
 
 
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        """Посты для ленты: автор и группа одним запросом, без лишних полей."""
+        return self.select_related('author', 'group').only(
+            'text',
+            'pub_date',
+            'image',
+            'author__username',
+            'group__slug',
+            'group__title',
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст поста',
@@ -56,13 +78,37 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
-        blank=True
+        storage=HashedStorage(),
+        blank=True,
+        validators=(validate_image,),
+    )
+    # Денормализованный счётчик: страница поста не считает комментарии.
+    comments_count = models.PositiveIntegerField(
+        'Всего комментариев',
+        default=0,
+        editable=False,
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -94,6 +140,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('post', '-created', '-id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
@@ -131,3 +183,140 @@ class Follow(CreatedModel):
                 name='follow_user_author_constraint'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('author', 'user'),
+                name='follow_author_user_idx',
+            ),
+        )
+
+
+class AuthorStatsQuerySet(models.QuerySet):
+    def bump(self, user_id, **deltas):
+        """
+        Атомарно меняет счётчики пользователя выражениями F().
+
+        Отсутствующая строка при увеличении пересчитывается с нуля,
+        при уменьшении — пропускается: её восстановит пересборка.
+        """
+        for field, delta in deltas.items():
+            rows = self.filter(user_id=user_id)
+            if delta < 0:
+                rows = rows.filter(**{f'{field}__gte': -delta})
+            if rows.update(**{field: F(field) + delta}):
+                continue
+            if delta > 0 and not self.filter(user_id=user_id).exists():
+                self.bulk_create(
+                    self.recount(user_ids=[user_id]), ignore_conflicts=True
+                )
+                return
+
+    def for_user(self, user):
+        """Счётчики пользователя; при отсутствии строки — пересчёт."""
+        try:
+            return self.get(user=user)
+        except self.model.DoesNotExist:
+            stats = self.recount(user_ids=[user.pk])
+            self.bulk_create(stats, ignore_conflicts=True)
+            return stats[0]
+
+    def recount(self, user_ids=None):
+        """Несохранённые строки со счётчиками, посчитанными с нуля."""
+        users = User.objects.order_by('pk')
+        posts = Post.objects.order_by()
+        follows = Follow.objects.order_by()
+        if user_ids is not None:
+            users = users.filter(pk__in=user_ids)
+            posts = posts.filter(author__in=user_ids)
+            follows = follows.filter(
+                models.Q(user__in=user_ids) | models.Q(author__in=user_ids)
+            )
+        posts_count = dict(
+            posts.values_list('author').annotate(Count('pk'))
+        )
+        followers_count = dict(
+            follows.values_list('author').annotate(Count('pk'))
+        )
+        following_count = dict(
+            follows.values_list('user').annotate(Count('pk'))
+        )
+        return [
+            self.model(
+                user_id=user_id,
+                posts_count=posts_count.get(user_id, 0),
+                followers_count=followers_count.get(user_id, 0),
+                following_count=following_count.get(user_id, 0),
+            )
+            for user_id in users.values_list('pk', flat=True)
+        ]
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счётчики пользователя для страницы профиля."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        'Всего постов',
+        default=0,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Всего подписчиков',
+        default=0,
+    )
+    following_count = models.PositiveIntegerField(
+        'Всего подписок',
+        default=0,
+    )
+
+    objects = AuthorStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'Статистика {self.user}'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок читателя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(
+        'Дата публикации поста',
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date', '-post_id')
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_pub_date_idx',
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='timeline_user_post_constraint'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post} в ленте {self.user}'
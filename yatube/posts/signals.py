@@ -0,0 +1,126 @@
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, fulltext, generations, thumbnails, timeline
+from .models import AuthorStats, Comment, Follow, Group, Post
+
+
+def follow_scopes(follow):
+    return [
+        generations.follows_scope(follow.author_id),
+        generations.follows_scope(follow.user_id),
+    ]
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def image_changed(post, stored_images):
+    image_storage().retain(post.image.name)
+    for image in stored_images:
+        image_storage().release(image)
+    if post.image:
+        # Миниатюры создаются в фоне после фиксации транзакции, чтобы
+        # поток пула уже видел сохранённый пост.
+        transaction.on_commit(lambda: thumbnails.schedule(post.pk))
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, raw=False, **kwargs):
+    if instance.pk is not None and not raw:
+        stored = Post.objects.filter(pk=instance.pk).values_list(
+            'group', 'image'
+        )
+        instance._stored_groups = [group_id for group_id, _ in stored]
+        instance._stored_images = [image for _, image in stored]
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    generations.bump(generations.scopes_for_post(instance))
+    stored_images = getattr(instance, '_stored_images', ())
+    if instance.image.name not in stored_images:
+        image_changed(instance, stored_images)
+    if created:
+        AuthorStats.objects.bump(instance.author_id, posts_count=1)
+        counters.bump(1)
+        if instance.group_id is not None:
+            counters.bump_group(instance.group_id, 1)
+        timeline.fan_out(instance)
+        return
+    for group_id in getattr(instance, '_stored_groups', ()):
+        if group_id != instance.group_id:
+            if group_id is not None:
+                counters.bump_group(group_id, -1)
+                generations.bump([generations.group_scope(group_id)])
+            if instance.group_id is not None:
+                counters.bump_group(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    generations.bump(generations.scopes_for_post(instance))
+    image_storage().release(instance.image.name)
+    AuthorStats.objects.bump(instance.author_id, posts_count=-1)
+    counters.bump(-1)
+    if instance.group_id is not None:
+        counters.bump_group(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.bump(instance.author_id, followers_count=1)
+        AuthorStats.objects.bump(instance.user_id, following_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        generations.bump(follow_scopes(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    was_celebrity = timeline.is_celebrity(instance.author_id)
+    AuthorStats.objects.bump(instance.author_id, followers_count=-1)
+    AuthorStats.objects.bump(instance.user_id, following_count=-1)
+    timeline.remove_author(instance.user_id, instance.author_id)
+    if was_celebrity and not timeline.is_celebrity(instance.author_id):
+        timeline.backfill_followers(instance.author_id)
+    generations.bump(follow_scopes(instance))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F('comments_count') + 1
+        )
+    generations.bump([generations.post_scope(instance.post_id)])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comments_count__gt=0
+    ).update(comments_count=F('comments_count') - 1)
+    generations.bump([generations.post_scope(instance.post_id)])
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    # Название группы выводится в карточках постов всех лент.
+    if not created and not raw:
+        generations.bump([generations.GLOBAL, generations.group_scope(
+            instance.pk
+        )])
+
+
+def restore_fulltext(sender, using, **kwargs):
+    # Подключается в PostsConfig.ready: post_migrate шлётся для каждого
+    # приложения, а триггеры достаточно проверить один раз.
+    fulltext.restore_triggers(connections[using])
@@ -0,0 +1,55 @@
+from django import template
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .. import cards, thumbnails
+from ..fulltext import HIGHLIGHT_END, HIGHLIGHT_START
+
+register = template.Library()
+
+
+@register.filter
+def highlight(text):
+    """Экранирует текст и выделяет найденные поиском слова тегом mark."""
+    return mark_safe(
+        escape(text).replace(HIGHLIGHT_START, '<mark>').replace(
+            HIGHLIGHT_END, '</mark>'
+        )
+    )
+
+
+@register.simple_tag
+def post_cards(posts, **flags):
+    """Пары (пост, карточка) из кэша карточек, см. posts.cards."""
+    return cards.render_many(posts, **flags)
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def post_picture(image, name):
+    """
+    Картинка поста в виде <picture>: варианты разной ширины по форматам
+    и миниатюра name для старых браузеров. Пока миниатюра создаётся,
+    выводится заглушка.
+    """
+    geometry, _ = settings.POST_THUMBNAILS[name]
+    width, height = geometry.split('x')
+    return {
+        'image': image,
+        'fallback': thumbnails.lookup(image, name),
+        'sources': [
+            {
+                'type': thumbnails.FORMATS[image_format],
+                'srcset': ', '.join(
+                    f'{thumbnail.url} {variant_width}w'
+                    for variant_width, thumbnail in variants
+                ),
+            }
+            for image_format, variants in thumbnails.lookup_variants(
+                image, name
+            ).items()
+        ],
+        'sizes': f'(max-width: {width}px) 100vw, {width}px',
+        'width': width,
+        'height': height,
+    }
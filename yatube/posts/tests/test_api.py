@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+GROUP_TEST_SLUG = 'test_slug'
+POSTS_COUNT = 5
+POSTS_ON_PAGES = 2
+API_INDEX_URL = reverse('posts:api_index')
+API_GROUP_URL = reverse(
+    'posts:api_group_list', kwargs={'slug': GROUP_TEST_SLUG}
+)
+API_PROFILE_URL = reverse(
+    'posts:api_profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+API_FOLLOW_URL = reverse('posts:api_follow_index')
+
+
+@override_settings(POSTS_ON_PAGES=POSTS_ON_PAGES)
+class TestApi(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_USERNAME)
+        cls.group = Group.objects.create(
+            title='Заголовок', slug=GROUP_TEST_SLUG, description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {index}'
+            )
+            for index in range(POSTS_COUNT)
+        ]
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий'
+        )
+        cls.API_COMMENTS_URL = reverse(
+            'posts:api_post_comments', kwargs={'post_id': cls.posts[0].id}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def read_all(self, url, **params):
+        """Проходит ленту по курсорам и возвращает все элементы."""
+        items = []
+        cursor = None
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            data = self.reader_client.get(url, params).json()
+            self.assertLessEqual(len(data['results']), POSTS_ON_PAGES)
+            items += data['results']
+            cursor = data['next']
+            if not cursor:
+                return items
+
+    def test_feeds(self):
+        """Ленты отдают все посты по курсорам от новых к старым."""
+        expected = [post.id for post in reversed(self.posts)]
+        for url in (
+            API_INDEX_URL, API_GROUP_URL, API_PROFILE_URL, API_FOLLOW_URL
+        ):
+            with self.subTest(url=url):
+                items = self.read_all(url)
+                self.assertEqual([item['id'] for item in items], expected)
+                self.assertEqual(items[0]['author'], TEST_AUTHOR_USERNAME)
+                self.assertEqual(items[0]['group'], GROUP_TEST_SLUG)
+                self.assertIsNone(items[0]['image'])
+
+    def test_sparse_fields(self):
+        """?fields= оставляет в ответе и в SELECT только нужные поля."""
+        with CaptureQueriesContext(connection) as queries:
+            data = self.reader_client.get(
+                API_INDEX_URL, {'fields': 'id,comments_count'}
+            ).json()
+        self.assertEqual(
+            data['results'][-1],
+            {'id': self.posts[-2].id, 'comments_count': 0},
+        )
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('"text"', select)
+        self.assertNotIn('auth_user', select)
+
+    def test_unknown_field(self):
+        """Неизвестное поле — ошибка запроса."""
+        response = self.reader_client.get(API_INDEX_URL, {'fields': 'email'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_comments(self):
+        """Комментарии поста отдаются со своими полями."""
+        item, = self.read_all(self.API_COMMENTS_URL)
+        self.assertEqual(item['post'], self.posts[0].id)
+        self.assertEqual(item['author'], TEST_USERNAME)
+
+    def test_not_modified(self):
+        """Повторный запрос с ETag получает 304, новый пост меняет ETag."""
+        for url in (API_INDEX_URL, API_FOLLOW_URL):
+            with self.subTest(url=url):
+                etag = self.reader_client.get(url)['ETag']
+                response = self.reader_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 304)
+        etag = self.reader_client.get(API_FOLLOW_URL)['ETag']
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.reader_client.get(
+            API_FOLLOW_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Post
+
+
+class TestBenchCommands(TestCase):
+    def run_command(self, name, **options):
+        stdout = StringIO()
+        call_command(name, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_bench_commands(self):
+        """Бенчмарки работают на текущей схеме и откатывают свои данные."""
+        for name, options in (
+            ('bench_search', {'posts': 20, 'vocabulary': 10, 'repeat': 1}),
+            ('bench_feed_indexes', {
+                'posts': 50, 'comments': 20, 'authors': 22, 'groups': 2,
+                'repeat': 1,
+            }),
+            ('bench_follow_feed', {
+                'readers': 10, 'authors': 3, 'follows': 2, 'posts': 5,
+                'reads': 3, 'thresholds': [1000, 2],
+            }),
+        ):
+            with self.subTest(name=name):
+                self.assertTrue(self.run_command(name, **options))
+                self.assertFalse(Post.objects.exists())
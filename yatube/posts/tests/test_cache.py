@@ -2,29 +2,89 @@ from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 
-from ..models import Post, User
+from .. import generations
+from ..models import Comment, Group, Post, User
 
 INDEX_URL = reverse('posts:index')
 TEST_AUTHOR_USERNAME = 'USERNAME'
+GROUP_TEST_SLUG = 'test_slug'
 POST_TEST_TEXT = 'Текст поста'
+NEW_POST_TEXT = 'Новый текст поста'
+COMMENT_TEST_TEXT = 'Текст комментария'
+GROUP_POSTS_URL = reverse(
+    'posts:group_list', kwargs={'slug': GROUP_TEST_SLUG}
+)
+PROFILE_URL = reverse(
+    'posts:profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
 
 
 class TestCache(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create(
             username=TEST_AUTHOR_USERNAME
         )
         self.author = Client()
         self.author.force_login(self.user)
+        self.group = Group.objects.create(
+            title='Заголовок',
+            slug=GROUP_TEST_SLUG,
+            description='Описание группы',
+        )
         self.post = Post.objects.create(
             text=POST_TEST_TEXT,
             author=self.user,
+            group=self.group,
+        )
+        self.post_detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id}
         )
 
     def test_index_cache(self):
-        """Проверка кэширования главной страницы"""
+        """Главная страница берётся из кэша, пока посты не менялись."""
         content = self.client.get(INDEX_URL).content
-        Post.objects.all().delete()
+        Post.objects.filter(pk=self.post.pk).update(text=NEW_POST_TEXT)
         self.assertEqual(content, Client().get(INDEX_URL).content)
         cache.clear()
         self.assertNotEqual(content, Client().get(INDEX_URL).content)
+
+    def test_feeds_are_invalidated_by_signals(self):
+        """Создание, правка и удаление поста сразу видны во всех лентах."""
+        for url in (INDEX_URL, GROUP_POSTS_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                self.client.get(url)
+                self.post.text = NEW_POST_TEXT
+                self.post.save()
+                self.assertContains(self.client.get(url), NEW_POST_TEXT)
+                post = Post.objects.create(
+                    text=POST_TEST_TEXT, author=self.user, group=self.group
+                )
+                self.assertEqual(
+                    len(self.client.get(url).context['page_obj']), 2
+                )
+                post.delete()
+                self.assertEqual(
+                    len(self.client.get(url).context['page_obj']), 1
+                )
+                self.post.text = POST_TEST_TEXT
+                self.post.save()
+
+    def test_comment_invalidates_post_detail(self):
+        """Новый комментарий сразу виден на странице поста."""
+        self.client.get(self.post_detail_url)
+        Comment.objects.create(
+            text=COMMENT_TEST_TEXT, author=self.user, post=self.post
+        )
+        self.assertContains(
+            self.client.get(self.post_detail_url), COMMENT_TEST_TEXT
+        )
+
+    def test_lost_generation_is_not_reused(self):
+        """Вытесненное поколение не совпадает с уже выданными."""
+        generation = generations.current(generations.GLOBAL)
+        generations.bump([generations.GLOBAL])
+        cache.delete(generations.KEY.format(generations.GLOBAL))
+        self.assertGreater(
+            generations.current(generations.GLOBAL), generation + 1
+        )
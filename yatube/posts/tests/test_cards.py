@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import cards
+from ..models import Follow, Group, Post, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+GROUP_TEST_SLUG = 'test_slug'
+POST_TEST_TEXT = 'Текст поста'
+NEW_POST_TEXT = 'Новый текст поста'
+DELETE_BUTTON = 'Удалить пост'
+POSTS_COUNT = 3
+
+INDEX_URL = reverse('posts:index')
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+GROUP_POSTS_URL = reverse(
+    'posts:group_list', kwargs={'slug': GROUP_TEST_SLUG}
+)
+
+
+class TestPostCards(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_USERNAME)
+        cls.group = Group.objects.create(
+            title='Заголовок',
+            slug=GROUP_TEST_SLUG,
+            description='Описание группы',
+        )
+        for number in range(POSTS_COUNT):
+            Post.objects.create(
+                text=f'{POST_TEST_TEXT} {number}',
+                author=cls.user,
+                group=cls.group,
+            )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+        cls.another = Client()
+        cls.another.force_login(cls.reader)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_are_shared_between_feeds(self):
+        """Карточки, нарисованные для одной ленты, берутся из кэша в другой."""
+        self.client.get(INDEX_URL)
+        with mock.patch.object(
+            cards, 'render', wraps=cards.render
+        ) as render, mock.patch.object(
+            cache, 'get_many', wraps=cache.get_many
+        ) as get_many:
+            self.another.get(FOLLOW_INDEX_URL)
+        render.assert_not_called()
+        card_calls = [
+            keys for (keys,), _ in get_many.call_args_list
+            if all(key.startswith('post_card:') for key in keys)
+        ]
+        self.assertEqual(len(card_calls), 1)
+
+    def test_variants_are_cached_separately(self):
+        """Карточка без ссылки на группу кэшируется отдельно."""
+        self.client.get(INDEX_URL)
+        content = self.client.get(GROUP_POSTS_URL).content.decode()
+        self.assertNotIn(f'#{self.group.title}', content)
+
+    def test_user_parts_are_not_cached(self):
+        """Кнопка удаления видна только автору при общих карточках."""
+        self.another.get(FOLLOW_INDEX_URL)
+        self.assertNotContains(self.another.get(INDEX_URL), DELETE_BUTTON)
+        self.assertContains(
+            self.author.get(INDEX_URL), DELETE_BUTTON, count=POSTS_COUNT
+        )
+
+    def test_edit_changes_card_version(self):
+        """Правка поста меняет ключ карточки."""
+        post = Post.objects.first()
+        key = cards.key(post)
+        post.text = NEW_POST_TEXT
+        self.assertNotEqual(key, cards.key(post))
+        post.save()
+        self.assertContains(self.another.get(FOLLOW_INDEX_URL), NEW_POST_TEXT)
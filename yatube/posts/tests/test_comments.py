@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+POST_TEST_TEXT = 'Текст поста'
+COMMENTS_COUNT = 5
+COMMENTS_ON_PAGE = 2
+# Пост и страница комментариев с авторами — независимо от их числа.
+COMMENTS_PAGE_QUERIES = 2
+
+
+@override_settings(COMMENTS_ON_PAGE=COMMENTS_ON_PAGE)
+class TestComments(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.post = Post.objects.create(author=cls.user, text=POST_TEST_TEXT)
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий {index}'
+            )
+            for index in range(COMMENTS_COUNT)
+        ]
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.id}
+        )
+        cls.POST_COMMENTS_URL = reverse(
+            'posts:post_comments', kwargs={'post_id': cls.post.id}
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_comments_count(self):
+        """Счётчик комментариев меняется при добавлении и удалении."""
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, COMMENTS_COUNT)
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='Ещё один'
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, COMMENTS_COUNT + 1)
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, COMMENTS_COUNT)
+
+    def test_load_more(self):
+        """Страницы «Показать ещё» проходят все комментарии по разу."""
+        response = self.client.get(self.POST_DETAIL_URL)
+        page = response.context['comments']()
+        seen = list(page)
+        while page.has_next():
+            with self.assertNumQueries(COMMENTS_PAGE_QUERIES):
+                response = self.client.get(
+                    self.POST_COMMENTS_URL, {'cursor': page.next_cursor}
+                )
+            page = response.context['comments']
+            self.assertLessEqual(len(page), COMMENTS_ON_PAGE)
+            seen += page
+        self.assertEqual(seen, self.comments[::-1])
+        self.assertNotContains(response, 'data-comments-more')
+
+    def test_first_page_links_to_next(self):
+        """Страница поста выводит первую страницу и ссылку на следующую."""
+        response = self.client.get(self.POST_DETAIL_URL)
+        self.assertContains(response, 'Комментарий 4')
+        self.assertNotContains(response, 'Комментарий 2')
+        self.assertContains(response, 'data-comments-more')
+        self.assertContains(
+            response, f'Колличество комментариев: {COMMENTS_COUNT}'
+        )
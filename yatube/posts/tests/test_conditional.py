@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+GROUP_TEST_SLUG = 'test_slug'
+POST_TEST_TEXT = 'Текст поста'
+COMMENT_TEST_TEXT = 'Текст комментария'
+
+INDEX_URL = reverse('posts:index')
+GROUP_POSTS_URL = reverse(
+    'posts:group_list', kwargs={'slug': GROUP_TEST_SLUG}
+)
+PROFILE_URL = reverse(
+    'posts:profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+
+
+class TestConditionalGet(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_USERNAME)
+        cls.group = Group.objects.create(
+            title='Заголовок',
+            slug=GROUP_TEST_SLUG,
+            description='Описание группы',
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEST_TEXT, author=cls.user, group=cls.group
+        )
+        cls.post_detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.id}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.another = Client()
+        self.another.force_login(self.reader)
+
+    def assertNotModified(self, url, **headers):
+        response = self.another.get(url, **headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+    def test_not_modified_without_rendering(self):
+        """Повторный запрос с валидаторами получает 304 без шаблонов."""
+        for url in (
+            INDEX_URL, GROUP_POSTS_URL, PROFILE_URL, self.post_detail_url
+        ):
+            with self.subTest(url=url):
+                response = self.another.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertNotModified(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+
+    def test_if_modified_since(self):
+        """Страница не считается изменённой после Last-Modified."""
+        Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        response = self.another.get(INDEX_URL)
+        self.assertNotModified(
+            INDEX_URL, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+    def test_changes_update_etag(self):
+        """Пост, комментарий, подписка и пользователь меняют ETag."""
+        changes = (
+            (INDEX_URL, lambda: Post.objects.create(
+                text=POST_TEST_TEXT, author=self.user
+            )),
+            (GROUP_POSTS_URL, lambda: Post.objects.create(
+                text=POST_TEST_TEXT, author=self.reader, group=self.group
+            )),
+            (PROFILE_URL, lambda: Follow.objects.create(
+                user=self.reader, author=self.user
+            )),
+            (self.post_detail_url, lambda: Comment.objects.create(
+                text=COMMENT_TEST_TEXT, author=self.reader, post=self.post
+            )),
+            (INDEX_URL, lambda: self.another.force_login(self.user)),
+        )
+        for url, change in changes:
+            with self.subTest(url=url):
+                etag = self.another.get(url)['ETag']
+                change()
+                self.assertEqual(
+                    self.another.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                    200,
+                )
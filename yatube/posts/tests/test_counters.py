@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import counters
+from ..models import AuthorStats, Follow, Group, Post, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+POST_TEST_TEXT = 'Текст поста'
+TIMELINE_LENGTH = 3
+
+
+class TestPostCounters(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_USERNAME)
+        cls.group = Group.objects.create(
+            title='Заголовок',
+            slug='test_slug',
+            description='Описание группы',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Заголовок 2',
+            slug='test_slug_2',
+            description='Описание группы 2',
+        )
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, group=self.group
+        )
+
+    def counts(self):
+        self.group.refresh_from_db()
+        self.group_2.refresh_from_db()
+        return [
+            counters.global_count(),
+            self.group.posts_count,
+            self.group_2.posts_count,
+            AuthorStats.objects.get(user=self.user).posts_count,
+        ]
+
+    def test_global_count_without_post_count(self):
+        """Общий счётчик берётся из AuthorStats и дальше — из кэша."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(counters.global_count(), 1)
+        sql, = [query['sql'] for query in queries.captured_queries]
+        self.assertNotIn('posts_post', sql)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.global_count(), 1)
+
+    def test_signals_bump_counters(self):
+        """Создание, перенос в другую группу и удаление меняют счётчики."""
+        self.assertEqual(self.counts(), [1, 1, 0, 1])
+        post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, group=self.group
+        )
+        self.assertEqual(self.counts(), [2, 2, 0, 2])
+        post.group = self.group_2
+        post.save()
+        self.assertEqual(self.counts(), [2, 1, 1, 2])
+        post.delete()
+        self.assertEqual(self.counts(), [1, 1, 0, 1])
+
+    def test_pages_without_post_count(self):
+        """Ленты сайта, группы и автора не считают посты через COUNT(*)."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse(
+                'posts:profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+            ),
+        ):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(
+                    response.context['page_obj'].paginator.count, 1
+                )
+                self.assertFalse([
+                    query['sql'] for query in queries.captured_queries
+                    if 'COUNT(' in query['sql']
+                ])
+
+    def test_group_count_in_cursor_mode(self):
+        """Число постов группы выводится и на курсорных страницах."""
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            {'cursor': ''},
+        )
+        self.assertContains(response, '<b>Всего постов в группе:</b>  1')
+
+    def test_follow_counter_sums_authors(self):
+        """Число постов в ленте подписок — сумма счётчиков авторов."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        count = counters.follow_counter(self.reader)
+        self.assertEqual(count(), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(count(), 2)
+
+    @override_settings(TIMELINE_LENGTH=TIMELINE_LENGTH)
+    def test_follow_counter_capped_by_timeline(self):
+        """Число постов обычных авторов не больше длины ленты."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        for _ in range(TIMELINE_LENGTH):
+            Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        self.assertEqual(
+            counters.follow_counter(self.reader)(), TIMELINE_LENGTH
+        )
+        with override_settings(TIMELINE_CELEBRITY_FOLLOWERS=1):
+            self.assertEqual(
+                counters.follow_counter(self.reader)(), TIMELINE_LENGTH + 1
+            )
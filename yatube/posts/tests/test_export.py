@@ -0,0 +1,94 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+TEST_USERNAME = 'user'
+EXPORT_URL = reverse('posts:export')
+LOGIN_URL = reverse('users:login')
+POSTS_COUNT = 3
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+class TestExport(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.another_user = User.objects.create_user(username=TEST_USERNAME)
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {index}')
+            for index in range(POSTS_COUNT)
+        ]
+        Post.objects.create(author=cls.another_user, text='Чужой пост')
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.another_user, text='Комментарий'
+        )
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+
+    def test_guest_redirected(self):
+        """Выгрузка доступна только авторизованным."""
+        self.assertRedirects(
+            self.client.get(EXPORT_URL), f'{LOGIN_URL}?next={EXPORT_URL}'
+        )
+
+    def test_ndjson(self):
+        """NDJSON отдаётся потоком и содержит только свои посты."""
+        response = self.author.get(EXPORT_URL)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows], [post.id for post in self.posts]
+        )
+        self.assertEqual(rows[0]['text'], 'Пост 0')
+        self.assertEqual(rows[0]['author__username'], TEST_AUTHOR_USERNAME)
+        self.assertEqual(rows[0]['comments_count'], 1)
+
+    def test_csv_gzip(self):
+        """CSV со сжатием распаковывается в заголовок и строки постов."""
+        response = self.author.get(EXPORT_URL, {'format': 'csv', 'gzip': 1})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('posts.csv.gz', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(
+            gzip.decompress(read(response)).decode()
+        )))
+        self.assertEqual(len(rows), POSTS_COUNT)
+        self.assertEqual(rows[1]['text'], 'Пост 1')
+
+    def test_comments(self):
+        """Выгружаются комментарии к своим постам."""
+        rows = read(self.author.get(EXPORT_URL, {'kind': 'comments'}))
+        row, = map(json.loads, rows.splitlines())
+        self.assertEqual(row['post_id'], self.posts[0].id)
+        self.assertEqual(row['author__username'], TEST_USERNAME)
+
+    def test_bad_parameters(self):
+        """Неизвестный формат или вид выгрузки — ошибка запроса."""
+        for params in ({'format': 'xml'}, {'kind': 'users'}):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.author.get(EXPORT_URL, params).status_code, 400
+                )
+
+    def test_export_command(self):
+        """Команда выгружает все посты сайта в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.ndjson.gz')
+            call_command('export_posts', gzip=True, output=path)
+            with gzip.open(path, 'rt') as stream:
+                rows = [json.loads(line) for line in stream]
+        self.assertEqual(len(rows), Post.objects.count())
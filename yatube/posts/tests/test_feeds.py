@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+GROUP_TEST_SLUG = 'test_slug'
+POST_TEST_TEXT = 'Текст поста'
+INDEX_RSS_URL = reverse('posts:index_rss')
+INDEX_ATOM_URL = reverse('posts:index_atom')
+GROUP_RSS_URL = reverse('posts:group_rss', kwargs={'slug': GROUP_TEST_SLUG})
+GROUP_ATOM_URL = reverse(
+    'posts:group_atom', kwargs={'slug': GROUP_TEST_SLUG}
+)
+PROFILE_RSS_URL = reverse(
+    'posts:profile_rss', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+PROFILE_ATOM_URL = reverse(
+    'posts:profile_atom', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+FEED_URLS = (
+    INDEX_RSS_URL, INDEX_ATOM_URL, GROUP_RSS_URL, GROUP_ATOM_URL,
+    PROFILE_RSS_URL, PROFILE_ATOM_URL,
+)
+
+
+class TestFeeds(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.group = Group.objects.create(
+            title='Заголовок', slug=GROUP_TEST_SLUG, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text=POST_TEST_TEXT
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds(self):
+        """Ленты отдают XML с постами."""
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('xml', response['Content-Type'])
+                self.assertContains(response, POST_TEST_TEXT)
+                self.assertIn('ETag', response)
+
+    def test_unknown_group(self):
+        """Лента несуществующей группы — 404."""
+        response = self.client.get(
+            reverse('posts:group_rss', kwargs={'slug': 'nowhere'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_poll_without_queries(self):
+        """Повторный опрос отдаётся из кэша: 304 или тот же XML."""
+        response = self.client.get(INDEX_RSS_URL)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(
+                    INDEX_RSS_URL, HTTP_IF_NONE_MATCH=response['ETag']
+                ).status_code,
+                304,
+            )
+            cached = self.client.get(INDEX_RSS_URL)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_new_post_invalidates(self):
+        """Новый пост меняет ETag и попадает в ленты."""
+        etags = {url: self.client.get(url)['ETag'] for url in FEED_URLS}
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Новый пост')
@@ -123,9 +123,7 @@ class TestFormClass(TestCase):
         self.assertEqual(post.text, form_data['text'])
         self.assertEqual(post.group.id, form_data['group'])
         self.assertEqual(post.author, self.user)
-        self.assertTrue(
-            str(form_data['image']).split('.')[0] in str(post.image.file)
-        )
+        self.assertEqual(post.image.read(), SMALL_GIF)
         self.assertRedirects(response, PROFILE_URL)
 
     def test_nonauthor_edit_post(self):
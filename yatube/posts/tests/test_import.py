@@ -0,0 +1,175 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .. import counters, fulltext, thumbnails
+from ..models import AuthorStats, Follow, Group, Post, TimelineEntry, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+TEST_READER_USERNAME = 'reader'
+GROUP_TEST_SLUG = 'test_slug'
+TEMP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+ROWS = [
+    {
+        'text': 'Пост из старого блога',
+        'author': TEST_AUTHOR_USERNAME,
+        'group': GROUP_TEST_SLUG,
+        'pub_date': '2020-05-01T10:00:00',
+        'image': 'small.gif',
+    },
+    {'text': 'Второй импортированный пост', 'author': TEST_AUTHOR_USERNAME},
+    {'text': 'Пост неизвестного автора', 'author': 'nobody'},
+    {'text': 'Пост в неизвестной группе', 'author': TEST_AUTHOR_USERNAME,
+     'group': 'nowhere'},
+]
+IMPORTED = 2
+
+
+@override_settings(MEDIA_ROOT=os.path.join(TEMP_DIR, 'media'))
+class TestImportPosts(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.group = Group.objects.create(
+            title='Группа', slug=GROUP_TEST_SLUG, description='Описание'
+        )
+        with open(os.path.join(TEMP_DIR, 'small.gif'), 'wb') as image:
+            image.write(SMALL_GIF)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def import_posts(self, name):
+        stderr = StringIO()
+        call_command(
+            'import_posts', os.path.join(TEMP_DIR, name), images=TEMP_DIR,
+            batch_size=1, chunk_size=1, stdout=StringIO(), stderr=stderr,
+        )
+        return stderr.getvalue()
+
+    def write_jsonl(self):
+        with open(os.path.join(TEMP_DIR, 'posts.jsonl'), 'w') as stream:
+            for row in ROWS:
+                stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def test_import_jsonl(self):
+        """Посты импортируются с датой и картинкой, миниатюры — в очередь."""
+        self.write_jsonl()
+        with mock.patch(
+            'posts.management.commands.import_posts.transaction.on_commit',
+            lambda func: func(),
+        ), mock.patch.object(thumbnails, 'schedule') as schedule:
+            errors = self.import_posts('posts.jsonl')
+        self.assertIn('Строка 3', errors)
+        self.assertIn('Строка 4', errors)
+        self.assertEqual(Post.objects.count(), IMPORTED)
+        post = Post.objects.get(group=self.group)
+        self.assertEqual(
+            post.pub_date, datetime(2020, 5, 1, 10, tzinfo=timezone.utc)
+        )
+        self.assertEqual(post.image.read(), SMALL_GIF)
+        schedule.assert_called_once_with(post.pk)
+
+    def test_import_updates_derived_data(self):
+        """После импорта верны счётчики, лента подписок и поиск."""
+        self.write_jsonl()
+        counters.global_count()
+        self.import_posts('posts.jsonl')
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, IMPORTED
+        )
+        self.assertEqual(
+            counters.global_count(), IMPORTED
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), IMPORTED
+        )
+        self.assertTrue(Post.objects.filter(fulltext.match('блога')))
+
+    def test_import_csv(self):
+        """CSV с заголовком читается так же, как JSONL."""
+        with open(
+            os.path.join(TEMP_DIR, 'posts.csv'), 'w', newline=''
+        ) as stream:
+            writer = csv.DictWriter(
+                stream, ('text', 'author', 'group', 'pub_date', 'image')
+            )
+            writer.writeheader()
+            writer.writerows(ROWS)
+        self.import_posts('posts.csv')
+        self.assertEqual(Post.objects.count(), IMPORTED)
+
+    def test_malformed_lines_skipped(self):
+        """Испорченные строки JSONL пропускаются с номером строки."""
+        with open(os.path.join(TEMP_DIR, 'broken.jsonl'), 'w') as stream:
+            stream.write(json.dumps(ROWS[1]) + '\n')
+            stream.write('{"text": \n')
+            stream.write('["не объект"]\n')
+            stream.write(json.dumps(ROWS[1]) + '\n')
+        errors = self.import_posts('broken.jsonl')
+        self.assertIn('Строка 2', errors)
+        self.assertIn('Строка 3', errors)
+        self.assertEqual(Post.objects.count(), IMPORTED)
+
+    def test_interrupted_import_keeps_derived_data(self):
+        """Пачки, сохранённые до сбоя, уже учтены в счётчиках и ленте."""
+        self.write_jsonl()
+        bulk_create = Post.objects.bulk_create
+        calls = []
+
+        def fail_second(*args, **kwargs):
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError('сбой')
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(
+            Post.objects, 'bulk_create', side_effect=fail_second
+        ):
+            with self.assertRaises(RuntimeError):
+                self.import_posts('posts.jsonl')
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 1
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 1
+        )
+
+    def test_not_an_image_skipped(self):
+        """Файл, который не картинка, не импортируется."""
+        with open(os.path.join(TEMP_DIR, 'fake.png'), 'w') as image:
+            image.write('не картинка')
+        with open(os.path.join(TEMP_DIR, 'fake.jsonl'), 'w') as stream:
+            stream.write(json.dumps(dict(ROWS[1], image='fake.png')) + '\n')
+        errors = self.import_posts('fake.jsonl')
+        self.assertIn('не похож на картинку', errors)
+        self.assertFalse(Post.objects.exists())
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from sorl.thumbnail import default
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+POST_TEST_TEXT = 'Текст поста'
+POSTS_COUNT = 5
+KVSTORE_TABLE = 'thumbnail_kvstore'
+INDEX_URL = reverse('posts:index')
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestThumbnailKVStore(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        for number in range(POSTS_COUNT):
+            post = Post.objects.create(
+                text=f'{POST_TEST_TEXT} {number}',
+                author=cls.user,
+                image=SimpleUploadedFile(
+                    name='small.gif',
+                    content=SMALL_GIF,
+                    content_type='image/gif',
+                ),
+            )
+            thumbnails.generate(post.pk)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        default.kvstore.clear_local()
+
+    def kvstore_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(INDEX_URL)
+        return [
+            query for query in queries.captured_queries
+            if KVSTORE_TABLE in query['sql']
+        ]
+
+    def test_page_prefetches_in_one_query(self):
+        """Записи о миниатюрах страницы загружаются одним запросом."""
+        self.assertEqual(len(self.kvstore_queries()), 1)
+
+    def test_local_cache_skips_database(self):
+        """Из памяти процесса записи берутся без запросов к базе."""
+        self.kvstore_queries()
+        cache.clear()
+        self.assertEqual(self.kvstore_queries(), [])
+
+    @override_settings(THUMBNAIL_LOCAL_CACHE_SIZE=1)
+    def test_local_cache_is_bounded(self):
+        """В памяти процесса хранится не больше заданного числа записей."""
+        post, other = Post.objects.all()[:2]
+        thumbnails.lookup(post.image, 'card')
+        thumbnails.lookup(other.image, 'card')
+        self.assertEqual(len(default.kvstore._local), 1)
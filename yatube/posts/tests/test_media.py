@@ -0,0 +1,176 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default
+
+from core.models import Blob
+from .. import thumbnails
+from ..models import Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+POST_TEST_TEXT = 'Текст поста'
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF[:-1] + b'\x3B\x00'
+# Время изменения файлов, которые старше порога clean_media.
+OLD_MTIME = time.time() - 2 * 24 * 60 * 60
+
+
+def uploaded(content=SMALL_GIF, name='small.gif'):
+    return SimpleUploadedFile(
+        name=name, content=content, content_type='image/gif'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@mock.patch('core.storage.transaction.on_commit', lambda func: func())
+class TestHashedStorage(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.storage = Post._meta.get_field('image').storage
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, image):
+        return Post.objects.create(
+            author=self.user, text=POST_TEST_TEXT, image=image
+        )
+
+    def test_same_content_is_stored_once(self):
+        """Одинаковые загрузки хранятся одним файлом с двумя ссылками."""
+        first = self.create_post(uploaded(name='first.gif'))
+        second = self.create_post(uploaded(name='second.GIF'))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(self.storage.is_hashed(first.image.name))
+        self.assertEqual(Blob.objects.get().references, 2)
+
+    def test_last_reference_deletes_file(self):
+        """Файл удаляется вместе с последним постом со ссылкой на него."""
+        first = self.create_post(uploaded())
+        second = self.create_post(uploaded())
+        name = first.image.name
+        first.delete()
+        self.assertTrue(self.storage.exists(name))
+        second.delete()
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_replaced_image_is_released(self):
+        """Замена картинки при правке освобождает старый файл."""
+        post = self.create_post(uploaded())
+        old_name = post.image.name
+        post.image = uploaded(OTHER_GIF)
+        post.save()
+        self.assertFalse(self.storage.exists(old_name))
+        self.assertEqual(
+            list(Blob.objects.values_list('name', 'references')),
+            [(post.image.name, 1)],
+        )
+
+    def test_dedupe_media(self):
+        """Команда переносит старые загрузки под хэш и убирает дубли."""
+        first = default_storage.save('posts/first.gif', ContentFile(SMALL_GIF))
+        second = default_storage.save(
+            'posts/second.gif', ContentFile(SMALL_GIF)
+        )
+        posts = [self.create_post(first), self.create_post(second)]
+        # Одинаковые картинки разных тестов хранятся под одним именем.
+        cache.clear()
+        default.kvstore.clear_local()
+        call_command('dedupe_media', stdout=StringIO())
+        names = {
+            Post.objects.get(pk=post.pk).image.name for post in posts
+        }
+        self.assertEqual(len(names), 1)
+        name, = names
+        self.assertTrue(self.storage.is_hashed(name))
+        self.assertEqual(self.storage.open(name).read(), SMALL_GIF)
+        self.assertFalse(default_storage.exists(first))
+        self.assertFalse(default_storage.exists(second))
+        self.assertEqual(Blob.objects.get(name=name).references, 2)
+        self.assertTrue(thumbnails.ready(
+            Post.objects.get(pk=posts[0].pk).image
+        ))
+
+    def test_dedupe_media_dry_run(self):
+        """С --dry-run команда ничего не меняет."""
+        name = default_storage.save('posts/old.gif', ContentFile(SMALL_GIF))
+        post = self.create_post(name)
+        call_command('dedupe_media', dry_run=True, stdout=StringIO())
+        self.assertEqual(Post.objects.get(pk=post.pk).image.name, name)
+        self.assertTrue(default_storage.exists(name))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class TestCleanMedia(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        default.kvstore.clear_local()
+        self.post = Post.objects.create(
+            author=self.user, text=POST_TEST_TEXT, image=uploaded()
+        )
+        thumbnails.generate(self.post.pk)
+        self.thumbnail = thumbnails.lookup(self.post.image, 'card').name
+        self.orphans = [
+            default_storage.save('posts/deleted.gif', ContentFile(SMALL_GIF)),
+            default_storage.save('cache/00/00/old.jpg', ContentFile(b'old')),
+        ]
+        for name in self.orphans + [self.post.image.name, self.thumbnail]:
+            os.utime(default_storage.path(name), (OLD_MTIME, OLD_MTIME))
+
+    def clean_media(self, **options):
+        call_command('clean_media', stdout=StringIO(), **options)
+
+    def test_orphans_are_deleted(self):
+        """Удаляются только файлы, на которые не ссылаются посты."""
+        self.clean_media()
+        for name in self.orphans:
+            with self.subTest(name=name):
+                self.assertFalse(default_storage.exists(name))
+        self.assertTrue(default_storage.exists(self.post.image.name))
+        self.assertTrue(default_storage.exists(self.thumbnail))
+
+    def test_dry_run_and_min_age(self):
+        """С --dry-run и для свежих файлов ничего не удаляется."""
+        fresh = default_storage.save('posts/fresh.gif', ContentFile(b'new'))
+        output = StringIO()
+        call_command('clean_media', dry_run=True, stdout=output)
+        self.assertIn('Лишних файлов: 2', output.getvalue())
+        self.clean_media()
+        self.assertTrue(default_storage.exists(fresh))
+        for name in self.orphans:
+            with self.subTest(name=name):
+                self.assertFalse(default_storage.exists(name))
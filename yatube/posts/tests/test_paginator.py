@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import CursorPaginator
+
+from ..models import Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+POSTS_ON_PAGE_3 = 3
+POSTS_COUNT = settings.POSTS_ON_PAGES * 2 + POSTS_ON_PAGE_3
+
+INDEX_URL = reverse('posts:index')
+PROFILE_URL = reverse(
+    'posts:profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+
+
+class TestCursorPaginator(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user)
+            for number in range(POSTS_COUNT)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, url, cursor=''):
+        return self.client.get(url, {'cursor': cursor}).context['page_obj']
+
+    def test_cursor_pages_cover_feed(self):
+        """Курсорные страницы проходят ленту без пропусков и повторов."""
+        for url in (INDEX_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                seen = []
+                page = self.get_page(url)
+                self.assertFalse(page.has_previous())
+                while True:
+                    seen.extend(post.id for post in page)
+                    if not page.has_next():
+                        break
+                    page = self.get_page(url, page.next_cursor)
+                self.assertEqual(len(page), POSTS_ON_PAGE_3)
+                self.assertEqual(
+                    seen,
+                    list(Post.objects.order_by(
+                        '-pub_date', '-id'
+                    ).values_list('id', flat=True))
+                )
+
+    def test_previous_cursor(self):
+        """Ссылка «Предыдущая» возвращает на ту же страницу."""
+        first = self.get_page(INDEX_URL)
+        second = self.get_page(INDEX_URL, first.next_cursor)
+        back = self.get_page(INDEX_URL, second.previous_cursor)
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in first]
+        )
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_bad_cursor_opens_first_page(self):
+        """Некорректный курсор открывает первую страницу."""
+        first = self.get_page(INDEX_URL)
+        page = self.get_page(INDEX_URL, 'not-a-cursor')
+        self.assertEqual(
+            [post.id for post in page], [post.id for post in first]
+        )
+
+    def test_single_query_without_count(self):
+        """Курсорная страница — один запрос без COUNT(*) и OFFSET."""
+        paginator = CursorPaginator(
+            Post.objects.all(), settings.POSTS_ON_PAGES
+        )
+        cursor = paginator.get_page().next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            list(paginator.get_page(cursor))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'])
+        self.assertNotIn('OFFSET', queries[0]['sql'])
+
+    def test_cursor_uses_index_range(self):
+        """Страница по курсору — диапазон индекса без сортировки в памяти."""
+        paginator = CursorPaginator(
+            Post.objects.all(), settings.POSTS_ON_PAGES
+        )
+        cursor = paginator.get_page().next_cursor
+        for cursor in (cursor, paginator.get_page(cursor).previous_cursor):
+            with self.subTest(cursor=cursor):
+                with CaptureQueriesContext(connection) as queries:
+                    list(paginator.get_page(cursor))
+                with connection.cursor() as db:
+                    db.execute(
+                        f'EXPLAIN QUERY PLAN {queries[0]["sql"]}'
+                    )
+                    plan = ' '.join(row[-1] for row in db.fetchall())
+                self.assertIn('SEARCH', plan)
+                self.assertIn('post_pub_date_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
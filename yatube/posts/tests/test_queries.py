@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+GROUP_TEST_SLUG = 'test_slug'
+PAGE_SIZES = (2, 10)
+POSTS_COUNT = 25
+
+INDEX_URL = reverse('posts:index')
+GROUP_POSTS_URL = reverse(
+    'posts:group_list', kwargs={'slug': GROUP_TEST_SLUG}
+)
+PROFILE_URL = reverse(
+    'posts:profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+# Бюджет запросов на страницу ленты (включая сессию, пользователя и
+# поиск группы или автора для ETag):
+# с пустым кэшем и с прогретыми счётчиками постов и фрагментами лент.
+QUERY_BUDGET = {
+    INDEX_URL: (4, 2),
+    GROUP_POSTS_URL: (5, 4),
+    PROFILE_URL: (7, 6),
+    FOLLOW_INDEX_URL: (5, 5),
+}
+
+
+class TestFeedQueries(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_USERNAME)
+        cls.group = Group.objects.create(
+            title='Заголовок',
+            slug=GROUP_TEST_SLUG,
+            description='Описание группы',
+            # bulk_create ниже не шлёт сигналов, обновляющих счётчик.
+            posts_count=POSTS_COUNT,
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user, group=cls.group)
+            for number in range(POSTS_COUNT)
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.another = Client()
+        cls.another.force_login(cls.reader)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """Число запросов ленты не зависит от размера страницы."""
+        for page_size in PAGE_SIZES:
+            for url, (cold, warm) in QUERY_BUDGET.items():
+                with self.subTest(url=url, page_size=page_size):
+                    cache.clear()
+                    with override_settings(POSTS_ON_PAGES=page_size):
+                        with self.assertNumQueries(cold):
+                            response = self.another.get(url)
+                        with self.assertNumQueries(warm):
+                            self.another.get(url)
+                    self.assertEqual(
+                        len(response.context['page_obj']), page_size
+                    )
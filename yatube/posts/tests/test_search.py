@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import fulltext
+from ..models import Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+SEARCH_URL = reverse('posts:search')
+
+
+class TestSearch(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.mountains = Post.objects.create(
+            text='Поход в горы и горы снова', author=cls.user
+        )
+        cls.sea = Post.objects.create(
+            text='Поездка на море, <b>горы</b> вдали', author=cls.user
+        )
+        Post.objects.create(text='Городские заметки', author=cls.user)
+
+    def search(self, query):
+        return self.client.get(SEARCH_URL, {'q': query})
+
+    def test_search_is_ranked(self):
+        """Поиск находит посты и ставит более релевантные выше."""
+        page = self.search('горы').context['page_obj']
+        self.assertEqual(list(page), [self.mountains, self.sea])
+
+    def test_search_highlights_and_escapes(self):
+        """Найденные слова выделяются, HTML из текста экранируется."""
+        content = self.search('море').content.decode()
+        self.assertIn('<mark>море</mark>', content)
+        self.assertIn('&lt;b&gt;горы&lt;/b&gt;', content)
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.create(text='Первый вариант', author=self.user)
+        post.text = 'Исправленный текст'
+        post.save()
+        self.assertFalse(self.search('вариант').context['page_obj'])
+        self.assertEqual(
+            list(self.search('исправленный').context['page_obj']), [post]
+        )
+        post.delete()
+        self.assertFalse(self.search('исправленный').context['page_obj'])
+
+    def test_fts_syntax_is_escaped(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+        for query in ('горы AND', '"горы', 'NEAR(', '***'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query).status_code, 200)
+
+    def test_pagination_keeps_query(self):
+        """Ссылки на страницы сохраняют поисковый запрос."""
+        with self.settings(POSTS_ON_PAGES=1):
+            content = self.search('горы').content.decode()
+        self.assertIn('?q=%D0%B3%D0%BE%D1%80%D1%8B&amp;page=2', content)
+
+    def test_cursor_mode_hides_count(self):
+        """Курсорная страница не печатает пустое число найденных."""
+        response = self.client.get(SEARCH_URL, {'q': 'горы', 'cursor': ''})
+        self.assertNotContains(response, 'Найдено постов')
+
+    def test_admin_match(self):
+        """Условие для поиска в админке использует индекс."""
+        self.assertEqual(
+            set(Post.objects.filter(fulltext.match('поход'))),
+            {self.mountains},
+        )
+
+    def test_migrate_restores_triggers(self):
+        """migrate возвращает пропавшие триггеры, а целые не трогает."""
+        with mock.patch.object(fulltext, 'rebuild') as rebuild:
+            emit_post_migrate_signal(0, False, connection.alias)
+        rebuild.assert_not_called()
+        post = Post.objects.create(text='Поход к озеру', author=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {fulltext.FTS_TABLE}_update')
+        post.text = 'Поход к реке'
+        post.save()
+        emit_post_migrate_signal(0, False, connection.alias)
+        self.assertEqual(list(self.search('реке').context['page_obj']), [post])
+        post.text = 'Поход к морю'
+        post.save()
+        self.assertFalse(self.search('реке').context['page_obj'])
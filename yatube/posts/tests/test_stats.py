@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+POST_TEST_TEXT = 'Текст поста'
+PROFILE_URL = reverse(
+    'posts:profile', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+UNFOLLOW_URL = reverse(
+    'posts:profile_unfollow', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+
+
+class TestAuthorStats(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.follower = User.objects.create_user(username=TEST_USERNAME)
+
+    def setUp(self):
+        self.post = Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        Follow.objects.create(user=self.follower, author=self.user)
+        self.another = Client()
+        self.another.force_login(self.follower)
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def assertStats(self, user, posts, followers, following):
+        stats = AuthorStats.objects.get(user=user)
+        self.assertEqual(
+            (stats.posts_count, stats.followers_count, stats.following_count),
+            (posts, followers, following),
+        )
+
+    def test_counters_follow_changes(self):
+        """Счётчики меняются вместе с постами и подписками."""
+        self.assertStats(self.user, 2, 1, 0)
+        self.assertStats(self.follower, 0, 0, 1)
+        self.another.get(UNFOLLOW_URL)
+        self.author.post(
+            reverse('posts:post_delete', kwargs={'post_id': self.post.id})
+        )
+        self.assertStats(self.user, 1, 0, 0)
+        self.assertStats(self.follower, 0, 0, 0)
+
+    def test_profile_shows_counters(self):
+        """Профиль берёт счётчики из строки статистики."""
+        stats = Client().get(PROFILE_URL).context['stats']
+        self.assertEqual(stats, AuthorStats.objects.get(user=self.user))
+        self.assertEqual(stats.posts_count, 2)
+
+    def test_rebuild_command_fixes_drift(self):
+        """Команда пересборки находит и исправляет расхождения."""
+        AuthorStats.objects.filter(user=self.user).update(posts_count=7)
+        AuthorStats.objects.filter(user=self.follower).delete()
+        out = StringIO()
+        call_command('rebuild_author_stats', '--check', stdout=out)
+        self.assertIn('posts_count 7 -> 2', out.getvalue())
+        self.assertStats(self.user, 7, 1, 0)
+        call_command('rebuild_author_stats', stdout=StringIO())
+        self.assertStats(self.user, 2, 1, 0)
+        self.assertStats(self.follower, 0, 0, 1)
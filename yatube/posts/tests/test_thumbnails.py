@@ -0,0 +1,151 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail import default
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+POST_TEST_TEXT = 'Текст поста'
+PLACEHOLDER = 'img/placeholder.svg'
+INDEX_URL = reverse('posts:index')
+POST_CREATE_URL = reverse('posts:create_post')
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded_gif():
+    return SimpleUploadedFile(
+        name='small.gif', content=SMALL_GIF, content_type='image/gif'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class TestThumbnails(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        # Одинаковые картинки разных тестов хранятся под одним именем.
+        default.kvstore.clear_local()
+
+    def test_image_change_schedules_generation(self):
+        """Любое сохранение с новой картинкой ставит миниатюры в очередь."""
+        with mock.patch(
+            'posts.signals.transaction.on_commit', lambda func: func()
+        ), mock.patch.object(thumbnails, 'schedule') as schedule:
+            self.author.post(POST_CREATE_URL, {
+                'text': POST_TEST_TEXT, 'image': uploaded_gif(),
+            })
+            post = Post.objects.get()
+            schedule.assert_called_once_with(post.pk)
+            post.text = 'Правка без картинки'
+            post.save()
+            schedule.assert_called_once_with(post.pk)
+            plain = Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+            plain.image = uploaded_gif()
+            plain.save()
+            schedule.assert_called_with(plain.pk)
+            self.assertEqual(schedule.call_count, 2)
+
+    def test_edit_during_generation_is_scheduled(self):
+        """Пост снимается с очереди до чтения, и правку не пропустить."""
+        post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, image=uploaded_gif()
+        )
+        queued = []
+
+        def read_post(*fields):
+            queued.append(post.pk in thumbnails._pending)
+            return Post.objects.none()
+
+        thumbnails._pending.add(post.pk)
+        with mock.patch.object(
+            Post.objects, 'select_related', side_effect=read_post
+        ):
+            thumbnails.generate(post.pk)
+        self.assertEqual(queued, [False])
+
+    def test_placeholder_until_generated(self):
+        """До создания миниатюры в ленте заглушка, и запрос её не создаёт."""
+        post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, image=uploaded_gif()
+        )
+        self.assertContains(self.client.get(INDEX_URL), PLACEHOLDER)
+        self.assertIsNone(thumbnails.lookup(post.image, 'card'))
+        thumbnails.schedule(post.pk)
+        thumbnail = thumbnails.lookup(post.image, 'card')
+        self.assertIsNotNone(thumbnail)
+        response = self.client.get(INDEX_URL)
+        self.assertNotContains(response, PLACEHOLDER)
+        self.assertContains(response, thumbnail.url)
+
+    def test_picture_lists_variants(self):
+        """Карточка выводит варианты всех ширин в srcset."""
+        post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, image=uploaded_gif()
+        )
+        thumbnails.generate(post.pk)
+        self.assertTrue(thumbnails.ready(post.image))
+        content = self.client.get(INDEX_URL).content.decode()
+        self.assertIn('<picture>', content)
+        for image_format in thumbnails.formats():
+            with self.subTest(image_format=image_format):
+                self.assertIn(
+                    f'type="{thumbnails.FORMATS[image_format]}"', content
+                )
+        for width in settings.POST_IMAGE_WIDTHS:
+            with self.subTest(width=width):
+                self.assertIn(f' {width}w', content)
+
+    def test_report_image_variants(self):
+        """Отчёт печатает строку на каждую ширину и формат."""
+        post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, image=uploaded_gif()
+        )
+        out = StringIO()
+        call_command('report_image_variants', generate=True, stdout=out)
+        self.assertTrue(thumbnails.ready(post.image))
+        self.assertIn('Постов с готовыми вариантами: 1', out.getvalue())
+        self.assertEqual(
+            len(out.getvalue().splitlines()),
+            2 + len(settings.POST_IMAGE_WIDTHS) * len(thumbnails.formats()),
+        )
+
+    def test_generate_thumbnails_adds_missing_variants(self):
+        """Команда дополняет посты, у которых есть только миниатюра."""
+        post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user, image=uploaded_gif()
+        )
+        geometry, options = settings.POST_THUMBNAILS['card']
+        thumbnails.backend.get_thumbnail(post.image, geometry, **options)
+        self.assertIsNotNone(thumbnails.lookup(post.image, 'card'))
+        self.assertFalse(thumbnails.ready(post.image))
+        call_command('generate_thumbnails', stdout=StringIO())
+        self.assertTrue(thumbnails.ready(post.image))
@@ -0,0 +1,172 @@
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import CursorPaginator
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, User
+
+TEST_USERNAME = 'user'
+TEST_AUTHOR_USERNAME = 'auth'
+TEST_OTHER_USERNAME = 'other'
+POST_TEST_TEXT = 'Текст поста'
+TIMELINE_LENGTH = 3
+
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+API_FOLLOW_URL = reverse('posts:api_follow_index')
+FOLLOW_URL = reverse(
+    'posts:profile_follow', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+UNFOLLOW_URL = reverse(
+    'posts:profile_unfollow', kwargs={'username': TEST_AUTHOR_USERNAME}
+)
+
+
+class TestTimeline(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_USERNAME)
+
+    def setUp(self):
+        self.old_post = Post.objects.create(
+            text=POST_TEST_TEXT, author=self.user
+        )
+        self.another = Client()
+        self.another.force_login(self.reader)
+
+    def timeline_posts(self):
+        return list(
+            TimelineEntry.objects.filter(user=self.reader).values_list(
+                'post', flat=True
+            )
+        )
+
+    def test_follow_backfills_and_unfollow_cleans(self):
+        """Подписка заполняет ленту, отписка очищает её."""
+        self.another.get(FOLLOW_URL)
+        self.assertEqual(self.timeline_posts(), [self.old_post.id])
+        self.another.get(UNFOLLOW_URL)
+        self.assertEqual(self.timeline_posts(), [])
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков и ленту подписок."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        post = Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        self.assertEqual(self.timeline_posts(), [post.id, self.old_post.id])
+        self.assertEqual(
+            list(self.another.get(FOLLOW_INDEX_URL).context['page_obj']),
+            [post, self.old_post],
+        )
+        post.delete()
+        self.assertEqual(self.timeline_posts(), [self.old_post.id])
+
+    @override_settings(TIMELINE_LENGTH=TIMELINE_LENGTH)
+    def test_timeline_is_trimmed(self):
+        """В ленте остаются только TIMELINE_LENGTH новейших записей."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        posts = [
+            Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+            for _ in range(TIMELINE_LENGTH)
+        ]
+        self.assertEqual(
+            self.timeline_posts(),
+            [post.id for post in reversed(posts)],
+        )
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=1)
+    def test_celebrity_posts_are_pulled_on_read(self):
+        """Посты знаменитостей не раскладываются, а читаются при показе."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        post = Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        self.assertEqual(self.timeline_posts(), [])
+        self.assertEqual(
+            list(self.another.get(FOLLOW_INDEX_URL).context['page_obj']),
+            [post, self.old_post],
+        )
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=2)
+    def test_former_celebrity_posts_stay_in_feed(self):
+        """Посты бывшей знаменитости остаются в лентах после отписок."""
+        other = User.objects.create_user(username=TEST_OTHER_USERNAME)
+        Follow.objects.create(user=self.reader, author=self.user)
+        Follow.objects.create(user=other, author=self.user)
+        post = Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+        self.assertNotIn(post.id, self.timeline_posts())
+        Follow.objects.get(user=other).delete()
+        self.assertEqual(self.timeline_posts(), [post.id, self.old_post.id])
+        self.assertEqual(
+            list(self.another.get(FOLLOW_INDEX_URL).context['page_obj']),
+            [post, self.old_post],
+        )
+
+    @override_settings(TIMELINE_LENGTH=TIMELINE_LENGTH)
+    def test_trim_keeps_newest_with_same_date(self):
+        """Записи с одинаковой датой обрезаются по post, а не все сразу."""
+        posts = [
+            Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+            for _ in range(TIMELINE_LENGTH + 1)
+        ]
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(
+                user=self.reader, post=post, pub_date=self.old_post.pub_date
+            )
+            for post in posts
+        )
+        timeline.trim([self.reader.pk])
+        self.assertEqual(
+            sorted(self.timeline_posts()),
+            [post.id for post in posts[1:]],
+        )
+
+    def test_feed_is_index_range(self):
+        """Лента подписок читается по индексу ленты без сортировки в памяти."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        sql, params = timeline.feed_for(
+            self.reader
+        )[:TIMELINE_LENGTH].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('timeline_user_pub_date_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=2)
+    def test_celebrity_merge_reads_index_ranges(self):
+        """Лента со знаменитостью сливается из диапазонов индексов."""
+        other = User.objects.create_user(username=TEST_OTHER_USERNAME)
+        celebrity = User.objects.create_user(username='celebrity')
+        Follow.objects.create(user=self.reader, author=self.user)
+        Follow.objects.create(user=self.reader, author=celebrity)
+        Follow.objects.create(user=other, author=celebrity)
+        for index in range(3):
+            Post.objects.create(text=POST_TEST_TEXT, author=self.user)
+            Post.objects.create(text=POST_TEST_TEXT, author=celebrity)
+        expected = list(Post.objects.filter(
+            author__in=(self.user, celebrity)
+        ).order_by('-pub_date', '-id').values_list('id', flat=True))
+        feed = timeline.feed_for(self.reader)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([post.id for post in feed[:3]], expected[:3])
+        self.assertTrue(queries.captured_queries)
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+                self.assertNotIn('SCAN', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+        paginator = CursorPaginator(feed, 2)
+        page = paginator.get_page()
+        seen = [post.id for post in page]
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            seen += [post.id for post in page]
+        self.assertEqual(seen, expected)
+        rows = self.another.get(
+            API_FOLLOW_URL, {'fields': 'id'}
+        ).json()['results']
+        self.assertEqual(
+            [row['id'] for row in rows], expected[:len(rows)]
+        )
@@ -0,0 +1,112 @@
+import resource
+import struct
+import tracemalloc
+import zlib
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post, User
+
+TEST_AUTHOR_USERNAME = 'auth'
+POST_CREATE_URL = reverse('posts:create_post')
+# Стороны холстов: 64 Мп проверяются по заголовку, 400 Мп Pillow
+# не открывает вовсе. Декодированная картинка заняла бы 64 и 400 МБ.
+BOMB_SIDES = (8000, 20000)
+# Сколько памяти может прибавиться за запрос: сам файл — меньше 100 КБ.
+PYTHON_MEMORY_LIMIT = 4 * 1024 * 1024
+PROCESS_MEMORY_LIMIT_KB = 48 * 1024
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def png_chunk(chunk_type, data):
+    return (
+        struct.pack('>I', len(data)) + chunk_type + data
+        + struct.pack('>I', zlib.crc32(chunk_type + data))
+    )
+
+
+def png_bomb(side):
+    """Чёрно-белый PNG side×side из нулей: десятки килобайт на диске."""
+    row = b'\x00' * (1 + (side + 7) // 8)
+    # Ширина, высота, 1 бит на пиксель, оттенки серого.
+    header = struct.pack('>IIBBBBB', side, side, 1, 0, 0, 0, 0)
+    compressor = zlib.compressobj(9)
+    data = b''.join(compressor.compress(row) for _ in range(side))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(b'IHDR', header)
+        + png_chunk(b'IDAT', data + compressor.flush())
+        + png_chunk(b'IEND', b'')
+    )
+
+
+class TestImageUploads(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(POST_CREATE_URL, {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content, 'image/png'),
+        })
+
+    def test_decompression_bomb(self):
+        """
+        Бомба отклоняется по заголовку, не занимая память под холст.
+        """
+        for side in BOMB_SIDES:
+            with self.subTest(side=side):
+                bomb = png_bomb(side)
+                process_peak = resource.getrusage(
+                    resource.RUSAGE_SELF
+                ).ru_maxrss
+                tracemalloc.start()
+                try:
+                    response = self.upload('bomb.png', bomb)
+                    _, python_peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                self.assertFormError(
+                    response, 'form', 'image',
+                    'Картинка слишком большая: допускается не больше '
+                    '40 мегапикселей.',
+                )
+                self.assertFalse(Post.objects.exists())
+                self.assertLess(python_peak, PYTHON_MEMORY_LIMIT)
+                self.assertLess(
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                    - process_peak,
+                    PROCESS_MEMORY_LIMIT_KB,
+                )
+
+    def test_not_an_image(self):
+        """Файл, который не начинается как картинка, отклоняется сразу."""
+        response = self.upload('fake.png', b'<?php echo 1; ?>' * 10)
+        self.assertFormError(
+            response, 'form', 'image',
+            'Файл не похож на картинку: загрузите JPEG, PNG, GIF или WebP.',
+        )
+
+    def test_file_size_limit(self):
+        """Файл больше MAX_UPLOAD_SIZE отклоняется."""
+        with self.settings(MAX_UPLOAD_SIZE=16):
+            response = self.upload('small.gif', SMALL_GIF)
+        self.assertFormError(
+            response, 'form', 'image',
+            'Файл слишком большой: допускается не больше 16\xa0байт.',
+        )
+        self.assertFalse(Post.objects.exists())
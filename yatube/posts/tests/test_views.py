@@ -168,14 +168,14 @@ class TestViewClass(TestCase):
             content=SMALL_GIF,
             content_type='image/gif'
         )
-        Post.objects.bulk_create(
-            Post(
+        # Посты создаются по одному: bulk_create не отправляет сигналы,
+        # а по ним посты раскладываются в ленты подписчиков.
+        for number in range(settings.POSTS_ON_PAGES + POSTS_ON_PAGE_2):
+            Post.objects.create(
                 text=f'Пост {number}',
                 author=self.user,
                 group=self.group,
                 image=uploaded)
-            for number in range(settings.POSTS_ON_PAGES + POSTS_ON_PAGE_2)
-        )
         cache.clear()
         for url, posts_count in PAGES_URL.items():
             with self.subTest(url=url):
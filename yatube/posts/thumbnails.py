@@ -0,0 +1,182 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from PIL import features
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.images import ImageFile
+
+from . import generations
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Форматы адаптивных вариантов в порядке предпочтения браузером.
+FORMATS = {
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+}
+
+_lock = threading.Lock()
+_executor = None
+_pending = set()
+
+
+class LookupBackend(ThumbnailBackend):
+    """Бэкенд sorl, который умеет искать готовую миниатюру, не создавая её."""
+
+    def thumbnail_file(self, file_, geometry_string, **options):
+        """Файл миниатюры, который создал бы get_thumbnail."""
+        source = ImageFile(file_)
+        # Параметры дополняются так же, как в ThumbnailBackend.get_thumbnail,
+        # иначе имя файла миниатюры не совпадёт.
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+    def lookup(self, file_, geometry_string, **options):
+        return default.kvstore.get(
+            self.thumbnail_file(file_, geometry_string, **options)
+        )
+
+
+backend = LookupBackend()
+
+
+def lookup(image, name):
+    """Готовая миниатюра из POST_THUMBNAILS или None."""
+    if not image:
+        return None
+    geometry, options = settings.POST_THUMBNAILS[name]
+    return backend.lookup(image, geometry, **options)
+
+
+def formats():
+    """Форматы вариантов; WebP — только если Pillow умеет его записывать."""
+    return [
+        image_format for image_format in FORMATS
+        if image_format != 'WEBP' or features.check('webp')
+    ]
+
+
+def variants(name):
+    """
+    Адаптивные варианты миниатюры name: ширины из POST_IMAGE_WIDTHS
+    в каждом формате с теми же пропорциями и обрезкой.
+
+    Возвращает четвёрки (ширина, формат, геометрия, параметры sorl).
+    """
+    geometry, options = settings.POST_THUMBNAILS[name]
+    width, height = map(int, geometry.split('x'))
+    return [
+        (
+            variant_width,
+            image_format,
+            f'{variant_width}x{round(height * variant_width / width)}',
+            {**options, 'format': image_format},
+        )
+        for image_format in formats()
+        for variant_width in settings.POST_IMAGE_WIDTHS
+    ]
+
+
+def geometries():
+    """Все миниатюры, которые создаются для картинки поста."""
+    for name, (geometry, options) in settings.POST_THUMBNAILS.items():
+        yield geometry, options
+        for _, _, variant_geometry, variant_options in variants(name):
+            yield variant_geometry, variant_options
+
+
+def lookup_variants(image, name):
+    """Готовые варианты по форматам: {формат: [(ширина, миниатюра)]}."""
+    found = {}
+    if not image:
+        return found
+    for width, image_format, geometry, options in variants(name):
+        thumbnail = backend.lookup(image, geometry, **options)
+        if thumbnail is not None:
+            found.setdefault(image_format, []).append((width, thumbnail))
+    return found
+
+
+def prefetch(images):
+    """
+    Загружает записи о миниатюрах и вариантах всех картинок разом,
+    если хранилище sorl это умеет (см. posts.kvstore).
+    """
+    if not hasattr(default.kvstore, 'prefetch'):
+        return
+    default.kvstore.prefetch([
+        backend.thumbnail_file(image, geometry, **options)
+        for image in images if image
+        for geometry, options in geometries()
+    ])
+
+
+def ready(image):
+    """Созданы ли все миниатюры и варианты картинки."""
+    return not image or all(
+        backend.lookup(image, geometry, **options) is not None
+        for geometry, options in geometries()
+    )
+
+
+def generate(post_id):
+    """Создаёт все миниатюры поста и сбрасывает фрагменты с его карточкой."""
+    # Пост снимается с очереди до чтения: правка во время работы
+    # поставит его заново, и новая картинка не потеряется.
+    with _lock:
+        _pending.discard(post_id)
+    try:
+        post = Post.objects.select_related('group').filter(pk=post_id).first()
+        if post is None or not post.image:
+            return
+        for geometry, options in geometries():
+            backend.get_thumbnail(post.image, geometry, **options)
+        generations.bump(generations.scopes_for_post(post))
+    except Exception:
+        logger.exception('Не удалось создать миниатюры поста %s', post_id)
+
+
+def _work(post_id):
+    try:
+        generate(post_id)
+    finally:
+        # Соединения с базой у каждого потока свои, пул их не закрывает.
+        connections.close_all()
+
+
+def schedule(post_id):
+    """
+    Ставит создание миниатюр поста в очередь пула потоков.
+
+    Повторная постановка поста, который ещё ждёт очереди, игнорируется.
+    При THUMBNAIL_WORKERS = 0 миниатюры создаются сразу.
+    """
+    global _executor
+    with _lock:
+        if post_id in _pending:
+            return
+        _pending.add(post_id)
+        if settings.THUMBNAIL_WORKERS and _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+    if settings.THUMBNAIL_WORKERS:
+        _executor.submit(_work, post_id)
+    else:
+        generate(post_id)
@@ -0,0 +1,212 @@
+import heapq
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+
+def is_celebrity(author_id):
+    """
+    Автор с числом подписчиков от TIMELINE_CELEBRITY_FOLLOWERS.
+
+    Его посты не раскладываются по лентам при записи, а подмешиваются
+    в ленту подписок при чтении.
+    """
+    return AuthorStats.objects.filter(
+        user=author_id,
+        followers_count__gte=settings.TIMELINE_CELEBRITY_FOLLOWERS,
+    ).exists()
+
+
+def fan_out(post):
+    """Раскладывает новый пост в ленты всех подписчиков автора."""
+    if is_celebrity(post.author_id):
+        return
+    followers = list(
+        Follow.objects.filter(author=post.author_id).values_list(
+            'user', flat=True
+        )
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers
+        ),
+        ignore_conflicts=True,
+    )
+    trim(followers)
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту читателя последние посты нового автора."""
+    if is_celebrity(author_id):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in Post.objects.filter(
+                author=author_id
+            ).order_by('-pub_date', '-id').values_list(
+                'id', 'pub_date'
+            )[:settings.TIMELINE_LENGTH]
+        ),
+        ignore_conflicts=True,
+    )
+    trim([user_id])
+
+
+def backfill_followers(author_id):
+    """
+    Раскладывает последние посты автора в ленты всех его подписчиков.
+
+    Нужно, когда автор перестаёт быть знаменитостью: его посты больше
+    не подмешиваются при чтении, а записанные, пока он был знаменитостью,
+    в ленты не попадали.
+    """
+    posts = list(
+        Post.objects.filter(author=author_id).order_by(
+            '-pub_date', '-id'
+        ).values_list('id', 'pub_date')[:settings.TIMELINE_LENGTH]
+    )
+    followers = list(
+        Follow.objects.filter(author=author_id).values_list(
+            'user', flat=True
+        )
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for user_id in followers
+            for post_id, pub_date in posts
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    trim(followers)
+
+
+def remove_author(user_id, author_id):
+    """Убирает из ленты читателя посты автора, от которого он отписался."""
+    TimelineEntry.objects.filter(
+        user=user_id, post__author=author_id
+    ).delete()
+
+
+def trim(user_ids):
+    """Оставляет в лентах только TIMELINE_LENGTH самых новых записей."""
+    for user_id in user_ids:
+        entries = TimelineEntry.objects.filter(user=user_id)
+        # post_id, а не post: сортировка по связи взяла бы порядок
+        # из Meta поста, то есть снова дату.
+        cutoff = entries.order_by('-pub_date', '-post_id').values_list(
+            'pub_date', 'post_id'
+        )[settings.TIMELINE_LENGTH:settings.TIMELINE_LENGTH + 1]
+        if cutoff:
+            # Удаляется всё от первой лишней записи в том же порядке:
+            # записи с той же датой, но новее по post, остаются.
+            pub_date, post_id = cutoff[0]
+            entries.filter(
+                Q(pub_date__lt=pub_date)
+                | Q(pub_date=pub_date, post__lte=post_id)
+            ).delete()
+
+
+class MergedFeed:
+    """
+    Лента подписок со знаменитостями: слияние упорядоченных источников.
+
+    Каждый источник — диапазон своего индекса: материализованная лента
+    и посты каждой знаменитости по (author, pub_date). Срез [a:b] читает
+    из каждого не больше b строк и сливает их в Python по полям
+    сортировки, пропуская посты, попавшие в несколько источников.
+    Поддерживает то, что нужно пагинаторам и API: срезы, filter,
+    order_by и values; поля сортировки идут в одном направлении.
+    """
+    model = Post
+    ordered = True
+
+    def __init__(self, sources, ordering=('-pub_date', '-id')):
+        self.sources = sources
+        self.ordering = tuple(ordering)
+
+    def _clone(self, method, *args, **kwargs):
+        return MergedFeed(
+            [
+                getattr(source, method)(*args, **kwargs)
+                for source in self.sources
+            ],
+            self.ordering,
+        )
+
+    def filter(self, *args, **kwargs):
+        return self._clone('filter', *args, **kwargs)
+
+    def values(self, *fields):
+        return self._clone('values', *fields)
+
+    def order_by(self, *ordering):
+        feed = self._clone('order_by', *ordering)
+        feed.ordering = ordering
+        return feed
+
+    def _key(self, item):
+        return tuple(
+            item[field] if isinstance(item, dict) else getattr(item, field)
+            for field in (order.lstrip('-') for order in self.ordering)
+        )
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        stop = index.stop
+        merged = heapq.merge(
+            *(source[:stop] for source in self.sources),
+            key=self._key,
+            reverse=self.ordering[0].startswith('-'),
+        )
+        items = []
+        seen = set()
+        for item in merged:
+            key = self._key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            items.append(item)
+            if stop is not None and len(items) >= stop:
+                break
+        return items[index]
+
+
+def feed_for(user):
+    """
+    Посты ленты подписок.
+
+    Без подписок на знаменитостей это диапазон по индексу (user, pub_date)
+    материализованной ленты; иначе к нему по дате подмешиваются посты
+    знаменитостей — каждой своим диапазоном индекса (см. MergedFeed).
+    """
+    celebrities = list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gte=(
+                settings.TIMELINE_CELEBRITY_FOLLOWERS
+            ),
+        ).values_list('author', flat=True)
+    )
+    # F() сортирует по столбцам самой ленты: имя связи в order_by
+    # подставило бы порядок из Meta поста и сортировку вне индекса.
+    posts = Post.objects.feed().filter(
+        timeline_entries__user=user
+    ).order_by(
+        F('timeline_entries__pub_date').desc(),
+        F('timeline_entries__post').desc(),
+    )
+    if not celebrities:
+        return posts
+    return MergedFeed([posts] + [
+        Post.objects.feed().filter(author=author_id).order_by(
+            '-pub_date', '-id'
+        )
+        for author_id in celebrities
+    ])
@@ -1,22 +1,53 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
     path('group/<slug:slug>/', views.group_posts_list, name='group_list'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/rss/', feeds.author_rss, name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.author_atom, name='profile_atom'
+    ),
+    path('search/', views.search, name='search'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment, name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments, name='post_comments'
+    ),
     path('posts/<int:post_id>/delete/', views.post_delete, name='post_delete'),
     path('create/', views.post_create, name='create_post'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('export/', views.export_posts, name='export'),
+    path('api/posts/', views.api_index, name='api_index'),
+    path(
+        'api/group/<slug:slug>/',
+        views.api_group_posts_list, name='api_group_list'
+    ),
+    path(
+        'api/profile/<str:username>/',
+        views.api_profile, name='api_profile'
+    ),
+    path('api/follow/', views.api_follow_index, name='api_follow_index'),
+    path(
+        'api/posts/<int:post_id>/comments/',
+        views.api_post_comments, name='api_post_comments'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
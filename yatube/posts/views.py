@@ -1,50 +1,139 @@
-from django.core.paginator import Paginator
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.db.models import QuerySet
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.paginator import CountedPaginator, CursorPaginator
+from . import (
+    api, counters, export, fulltext, generations, timeline,
+)
+from .conditional import conditional
 from .forms import CommentForm, PostForm
-from .models import Post, Group, User, Follow
+from .models import AuthorStats, Comment, Follow, Group, Post, User
 
 
-def get_page(request, posts: QuerySet):
-    return Paginator(posts, settings.POSTS_ON_PAGES).get_page(
-        request.GET.get('page')
+def get_page(request, posts: QuerySet, counter=None):
+    if 'cursor' in request.GET:
+        return CursorPaginator(posts, settings.POSTS_ON_PAGES).get_page(
+            request.GET.get('cursor')
+        )
+    return CountedPaginator(
+        posts, settings.POSTS_ON_PAGES, counter=counter
+    ).get_page(request.GET.get('page'))
+
+
+def group_scopes(request, slug):
+    group = get_object_or_404(Group.objects.only('id'), slug=slug)
+    return [generations.group_scope(group.id)]
+
+
+def profile_scopes(request, username):
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    return [
+        generations.author_scope(author.id),
+        generations.follows_scope(author.id),
+    ]
+
+
+def post_scopes(request, post_id):
+    return [generations.post_scope(post_id)]
+
+
+def follow_scopes(request):
+    """Подписки читателя и ленты всех авторов, на которых он подписан."""
+    authors = Follow.objects.filter(user=request.user).values_list(
+        'author', flat=True
     )
+    return [generations.follows_scope(request.user.pk)] + [
+        generations.author_scope(author_id) for author_id in authors
+    ]
 
 
+@conditional(lambda request: [generations.GLOBAL])
 def index(request):
+    posts = Post.objects.feed()
     return render(request, 'posts/index.html', {
-        'page_obj': get_page(request, Post.objects.all())
+        'page_obj': get_page(request, posts, counters.global_count),
+        'generation': generations.current(generations.GLOBAL),
+        'cache_timeout': settings.FEED_CACHE_TIMEOUT,
     })
 
 
+@conditional(group_scopes)
 def group_posts_list(request, slug):
     group = get_object_or_404(Group, slug=slug)
+    posts = group.posts.feed()
     return render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': get_page(request, group.posts.all()),
+        'page_obj': get_page(request, posts, lambda: group.posts_count),
+        'generation': generations.current(
+            generations.group_scope(group.id)
+        ),
+        'cache_timeout': settings.FEED_CACHE_TIMEOUT,
     })
 
 
+@conditional(profile_scopes)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
+    posts = author.posts.feed()
     follow = (request.user.is_authenticated
               and request.user.username != username
               and Follow.objects.filter(author=author,
                                         user=request.user).exists())
+    stats = AuthorStats.objects.for_user(author)
     return render(request, 'posts/profile.html', {
         'author': author,
-        'page_obj': get_page(request, author.posts.all()),
-        'following': follow
+        'stats': stats,
+        'page_obj': get_page(request, posts, lambda: stats.posts_count),
+        'following': follow,
+        'generation': generations.current(
+            generations.author_scope(author.id)
+        ),
+        'cache_timeout': settings.FEED_CACHE_TIMEOUT,
     })
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'page_obj': get_page(
+            request, fulltext.search(Post.objects.feed(), query)
+        ),
+    })
+
+
+def get_comments_page(post, cursor=None):
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_ON_PAGE,
+        ordering=('-created', '-id'),
+    ).get_page(cursor)
+
+
+@conditional(post_scopes)
 def post_detail(request, post_id):
+    post = get_object_or_404(Post, id=post_id)
+    cursor = request.GET.get('cursor')
     return render(request, 'posts/post_detail.html', {
-        'post': get_object_or_404(Post, id=post_id),
+        'post': post,
         'form': CommentForm(),
+        # Шаблон вызывает функцию, только если фрагмента нет в кэше.
+        'comments': lambda: get_comments_page(post, cursor),
+        'comments_cursor': cursor,
+        'generation': generations.current(generations.post_scope(post_id)),
+        'cache_timeout': settings.FEED_CACHE_TIMEOUT,
+    })
+
+
+@conditional(post_scopes)
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    return render(request, 'posts/includes/comments_page.html', {
+        'post': post,
+        'comments': get_comments_page(post, request.GET.get('cursor')),
     })
 
 
@@ -99,13 +188,87 @@ def post_edit(request, post_id):
 def follow_index(request):
     return render(request, 'posts/follow.html', {
         'page_obj': get_page(
-            request, Post.objects.filter(
-                author__following__user=request.user
-            )
+            request,
+            timeline.feed_for(request.user),
+            counters.follow_counter(request.user),
         )
     })
 
 
+@login_required
+def export_posts(request):
+    """Выгрузка своих постов или комментариев к ним потоком."""
+    kind = request.GET.get('kind', 'posts')
+    format = request.GET.get('format', 'ndjson')
+    if kind not in export.KINDS or format not in export.FORMATS:
+        return HttpResponseBadRequest()
+    gzip = 'gzip' in request.GET
+    response = StreamingHttpResponse(
+        export.stream(
+            kind, export.KINDS[kind](request.user.pk), format, gzip
+        ),
+        content_type=(
+            'application/gzip' if gzip else export.FORMATS[format]
+        ),
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(kind, format, gzip)}"'
+    )
+    return response
+
+
+def api_page(request, kind, queryset, per_page):
+    fields = api.parse_fields(kind, request.GET.get('fields'))
+    if fields is None:
+        return HttpResponseBadRequest()
+    return api.page_response(
+        kind, queryset, fields, per_page, request.GET.get('cursor')
+    )
+
+
+@conditional(lambda request: [generations.GLOBAL])
+def api_index(request):
+    return api_page(
+        request, 'posts', Post.objects.all(), settings.POSTS_ON_PAGES
+    )
+
+
+@conditional(group_scopes)
+def api_group_posts_list(request, slug):
+    group = get_object_or_404(Group.objects.only('id'), slug=slug)
+    return api_page(
+        request, 'posts', Post.objects.filter(group=group.id),
+        settings.POSTS_ON_PAGES,
+    )
+
+
+@conditional(profile_scopes)
+def api_profile(request, username):
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    return api_page(
+        request, 'posts', Post.objects.filter(author=author.id),
+        settings.POSTS_ON_PAGES,
+    )
+
+
+@login_required
+@conditional(follow_scopes)
+def api_follow_index(request):
+    return api_page(
+        request, 'posts', timeline.feed_for(request.user),
+        settings.POSTS_ON_PAGES,
+    )
+
+
+@conditional(post_scopes)
+def api_post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    return api_page(
+        request, 'comments', Comment.objects.filter(post=post.id),
+        settings.COMMENTS_ON_PAGE,
+    )
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -69,6 +70,13 @@ ROOT_URLCONF = 'yatube.urls'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Файлы пишутся на диск по частям и отклоняются, как только превысят
+# ограничения (см. core.uploadhandlers).
+FILE_UPLOAD_HANDLERS = ['core.uploadhandlers.LimitedUploadHandler']
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+# Больше пикселей картинка не может иметь независимо от размера файла:
+# сжатый PNG в сотню килобайт может развернуться в гигабайт.
+MAX_IMAGE_PIXELS = 40 * 10 ** 6
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
@@ -104,11 +112,30 @@ DATABASES = {
     }
 }
 
+# Кэш общий для всех процессов сервера: фрагменты, счётчики и номера
+# поколений видны каждому из них. В тестах кэш свой у каждого запуска,
+# иначе он пережил бы пересоздание тестовой базы. Кэш по умолчанию
+# обёрнут сбором метрик (см. core.metrics и /metrics).
+TESTING = 'test' in sys.argv or 'pytest' in sys.modules
 CACHES = {
     'default': {
+        'BACKEND': 'core.cache.InstrumentedCache',
+        'LOCATION': 'shared',
+    },
+    'shared': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+}
+if TESTING:
+    CACHES['shared'] = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
-}
+# Как часто процесс переносит свои метрики кэша в общий кэш, секунды.
+CACHE_METRICS_FLUSH_INTERVAL = 10
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -156,4 +183,33 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_ON_PAGES = 10
+# Комментарии на странице поста и в каждой подгрузке «Показать ещё».
+COMMENTS_ON_PAGE = 20
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+# Сколько последних постов хранится в материализованной ленте подписок.
+TIMELINE_LENGTH = 1000
+# С этого числа подписчиков посты автора не раскладываются по лентам
+# при записи, а читаются при показе ленты подписок.
+TIMELINE_CELEBRITY_FOLLOWERS = 10000
+# Срок жизни общего счётчика постов (см. posts.counters.global_count):
+# за это время расхождение из-за гонки с bump исчезает само.
+POST_COUNTER_TIMEOUT = 60 * 10
+# Фрагменты лент сбрасываются по событиям (см. posts.generations),
+# срок жизни лишь ограничивает память под старые поколения.
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+# Постов в RSS/Atom-лентах сайта, групп и авторов.
+SYNDICATION_ITEMS = 20
+# Миниатюры картинок постов: имя → (геометрия, параметры sorl).
+# Создаются в фоне после публикации, до этого в ленте стоит заглушка.
+POST_THUMBNAILS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+# Потоков, создающих миниатюры; 0 — создавать сразу в запросе.
+# В тестах пул не нужен: его потоки переживают тест и его MEDIA_ROOT.
+THUMBNAIL_WORKERS = 0 if TESTING else 2
+# Ширины адаптивных вариантов миниатюр для srcset, в пикселях.
+POST_IMAGE_WIDTHS = (320, 640, 960)
+# Записи о миниатюрах sorl дополнительно кэшируются в памяти процесса
+# и загружаются для всей страницы ленты разом (см. posts.kvstore).
+THUMBNAIL_KVSTORE = 'posts.kvstore.KVStore'
+THUMBNAIL_LOCAL_CACHE_SIZE = 10000
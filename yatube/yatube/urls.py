@@ -3,6 +3,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import include, path
 
+from core.views import cache_metrics
+
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 handler500 = 'core.views.server_error_500'
@@ -12,6 +14,7 @@ urlpatterns = [
     path("auth/", include("users.urls", namespace="users")),
     path("auth/", include("django.contrib.auth.urls")),
     path("about/", include("about.urls", namespace="about")),
+    path("metrics", cache_metrics, name="metrics"),
     path("", include("posts.urls", namespace="posts")),
 ]
 